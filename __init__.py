@@ -1,8 +1,8 @@
 import bpy
-from .operators import RePrimitive, RePrimitiveCircle, RePrimitiveCylinder, RePrimitiveTorus, RePrimitiveIcoSphere, RePrimitiveUVSphere, RePrimitiveCone, FixAppliedRotation, FixAppliedRotationAuto
-from .ui import RePrimitivePanel
+from .operators import RePrimitive, RePrimitiveCircle, RePrimitiveCylinder, RePrimitiveTorus, RePrimitiveIcoSphere, RePrimitiveUVSphere, RePrimitiveCone, RePrimitiveBatch, FixAppliedRotation
+from .ui import RePrimitivePanel, RePrimitiveDebugPanel
 from .prefs import RePrimitivePrefs
-from . import addon_updater_ops
+from . import addon_updater_ops, cache, speculative, stats
 
 bl_info = {
     "name": "RePrimitive",
@@ -16,6 +16,7 @@ bl_info = {
 classes = (
     RePrimitivePrefs,
     RePrimitivePanel,
+    RePrimitiveDebugPanel,
     RePrimitive,
     RePrimitiveCircle,
     RePrimitiveCone,
@@ -23,8 +24,8 @@ classes = (
     RePrimitiveTorus,
     RePrimitiveIcoSphere,
     RePrimitiveUVSphere,
+    RePrimitiveBatch,
     FixAppliedRotation,
-    FixAppliedRotationAuto,
 )
 
 addon_keymaps = []
@@ -62,9 +63,23 @@ def register():
     # registering menu in Object dropdown menu->
     bpy.types.VIEW3D_MT_object.append(menu_func)
 
+    # cached parameters of meshes that get edited are checked after every depsgraph update
+    bpy.app.handlers.depsgraph_update_post.append(cache.revalidate_updated)
+
+    # diagnostics and inferring ahead stay on between sessions, their handlers have to be added again
+    prefs = bpy.context.preferences.addons[__package__].preferences
+    stats.set_diagnostics(prefs.diagnostics)
+    speculative.set_enabled(prefs.speculative_inference)
+
 
 def unregister():
 
+    # removing the handlers of the cache, diagnostics and inferring ahead
+    if cache.revalidate_updated in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(cache.revalidate_updated)
+    stats.set_diagnostics(False)
+    speculative.set_enabled(False)
+
     # removing all keybinds
     for km, kmi in addon_keymaps:
         km.keymap_items.remove(kmi)
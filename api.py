@@ -0,0 +1,65 @@
+"""
+Functions for scripts that work on the objects they are given
+They never touch the selection, the active object, the 3D cursor or the mode, so thousands of objects cost no more than their meshes
+
+    from reprimitive import api
+
+    for ob in bpy.data.objects:
+        if api.primitive_type(ob):
+            api.rebuild(ob, {'vertices': 16, 'b_UV': True})
+"""
+
+import bpy
+from mathutils import Matrix
+from .core import primitive_type, infer_parameters, replace_primitive, solve_applied_rotation, apply_rotation_fix
+from .operators import BATCH_PARAMETERS, clamp_parameter
+
+__all__ = ('primitive_type', 'infer', 'rebuild', 'true_rotation', 'fix_rotation', 'clamp_parameter')
+
+# Keys every parameter set has on top of the parameters of its primitive
+PLACEMENT = ('primitive', 'location', 'rotation', 'origin')
+
+# Parameters of every primitive type, the ones infer returns next to the placement and rebuild takes
+PARAMETERS = {primitive: tuple(name for name, _ in names) for primitive, (_, names) in BATCH_PARAMETERS.items()}
+
+
+def infer(ob: bpy.types.Object, primitive: str = '') -> dict:
+    """
+    Everything the primitive was created with, parameters use the same names as the properties of the tweak operators
+    Also has the primitive type and the true location, rotation and origin, rebuild takes the same dict back
+    The type comes from the mesh name unless given, raises ValueError for anything that isn't a primitive
+    """
+
+    primitive = primitive or primitive_type(ob)
+    if not primitive:
+        raise ValueError(f"{ob.name} is not a primitive we recognize")
+
+    parameters, location, rotation, origin, _ = infer_parameters(ob, primitive)
+    return dict(parameters, primitive=primitive, location=location, rotation=rotation, origin=origin)
+
+
+def rebuild(ob: bpy.types.Object, parameters: dict) -> None:
+    """
+    Replaces the mesh of the object with a primitive made from given parameters
+    Anything missing is inferred from the object first, so {'vertices': 16} only changes the vertex count
+    A dict from infer skips the inference, the mesh can't be in edit mode since we don't change modes for it
+    """
+
+    if not set(PLACEMENT) <= parameters.keys():
+        parameters = dict(infer(ob, parameters.get('primitive', '')), **parameters)
+
+    parameters = dict(parameters)
+    primitive, location, rotation, origin = (parameters.pop(key) for key in PLACEMENT)
+
+    replace_primitive(ob, primitive, parameters, location, rotation, 'WORLD', origin)
+
+
+def true_rotation(ob: bpy.types.Object) -> Matrix:
+    """ Rotation(in world space) the object would have if its rotation was never applied """
+    rotation = ob.matrix_world.to_quaternion().to_matrix()
+    return rotation @ Matrix(solve_applied_rotation(ob).tolist())
+
+
+def fix_rotation(ob: bpy.types.Object) -> None:
+    """ Moves the applied rotation from the mesh back to the object, the object looks exactly the same """
+    apply_rotation_fix(ob, solve_applied_rotation(ob))
@@ -0,0 +1,82 @@
+import bpy
+from .localization import *
+from .core import infer_parameters
+from .builders import build_cylinder, write_geometry
+from .operators import LivePreview, RePrimitiveCylinder
+
+
+class CylinderPreview(LivePreview):
+    """
+    Stands in for the popup of the cylinder tweak, it has the same properties and runs the same preview and execute code
+    Operators can't be made from Python without running them, and a running popup can't be dragged from a script
+    """
+
+    bl_idname = RePrimitiveCylinder.bl_idname
+    __annotations__ = RePrimitiveCylinder.__annotations__
+    execute = RePrimitiveCylinder.execute
+
+    from_check = False
+
+
+def datablock_counts() -> tuple[int, int]:
+    """ Meshes and objects in the file, every one a preview creates ends up in the next undo step """
+    return len(bpy.data.meshes), len(bpy.data.objects)
+
+
+def audit_preview(ticks: int = 500) -> dict:
+    """
+    Drags the sliders of a cylinder the way a long tweak session would and reports what it left behind
+    Every tick goes through the live preview of the tweak and pushes an undo step, the same as confirming the tweak every time
+    Undo memory stops growing once the undo steps from the preferences are used up, what it grows by until then is the cost of a step
+    Run it from the Python console or a script, it cleans up the cylinder it makes and gives back the active object
+    """
+
+    mesh = bpy.data.meshes.new(localization_cylinder)
+    write_geometry(mesh, build_cylinder(32, 1.0, 2.0, 'NGON', True), False)
+    ob = bpy.data.objects.new(localization_cylinder, mesh)
+    bpy.context.collection.objects.link(ob)
+
+    view_layer = bpy.context.view_layer
+    active = view_layer.objects.active
+    view_layer.objects.active = ob
+    view_layer.update()
+
+    # Same as invoke, minus the popup
+    popup = CylinderPreview()
+    parameters, popup.saved_loc, popup.saved_rot, popup.origin, _ = infer_parameters(ob, 'CYLINDER')
+    for name, value in parameters.items():
+        setattr(popup, name, value)
+    popup.align = 'WORLD'
+
+    pointer = mesh.as_pointer()
+    undo_memory, datablocks = [], []
+
+    for tick in range(ticks):
+        # Every tenth tick changes the topology, the ones in between only change dimensions
+        popup.vertices = 32 + tick // 10 % 8
+        popup.radius = 1 + tick % 10 / 10
+        popup.preview(bpy.context)
+
+        bpy.ops.ed.undo_push(message=f"{RePrimitiveCylinder.bl_label} {tick}")
+        undo_memory.append(bpy.app.memory_usage_undo())
+        datablocks.append(datablock_counts())
+
+    report = {
+        'ticks': ticks,
+        'undo_steps': bpy.context.preferences.edit.undo_steps,
+        'datablocks_first_tick': datablocks[0],
+        'datablocks_last_tick': datablocks[-1],
+        'same_mesh': ob.data.as_pointer() == pointer,
+        'undo_memory_first_tick': undo_memory[0],
+        'undo_memory_last_tick': undo_memory[-1],
+        'undo_memory_peak': max(undo_memory),
+    }
+
+    # The mesh may be a copy if the operator ever swapped it, we remove whatever the object ends up with
+    mesh = ob.data
+    bpy.data.objects.remove(ob)
+    bpy.data.meshes.remove(mesh)
+    view_layer.objects.active = active
+    bpy.ops.ed.undo_push(message="RePrimitive audit")
+
+    return report
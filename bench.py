@@ -0,0 +1,333 @@
+"""
+Benchmarks for the hot paths of the tweak operators, run them with
+
+    blender --background --factory-startup --python bench.py -- --output bench.json
+
+Every primitive type is built with counts from 3 to 500, every fill type, with and without applied rotation and with and without modifiers
+Each case times the invoke(full inference and a cache hit), rotation recovery, execute(a full rebuild and one that only changes dimensions)
+and the fingerprint that decides if the cache still matches, it has to stay far below the inference it saves
+Invoke and execute include the depsgraph evaluation after them, that's where modifier stacks cost time
+A last run fingerprints a batch of dense meshes one after the other and in a thread pool
+The batch run rebuilds 1,000 imported cylinders(nothing cached) at 16 segments and checks it against BATCH_TARGET
+The JSON has percentiles for every case and a log-log slope of time against vertex count per stage, anything near 2 grew quadratically
+Plots need matplotlib which Blender doesn't ship, so they're made from the JSON with plain Python:
+
+    python bench.py --plot bench.json
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+from time import perf_counter
+
+import numpy as np
+
+COUNTS = (3, 4, 8, 16, 32, 64, 128, 256, 500)
+FILLS = ('NOTHING', 'NGON', 'TRIFAN')
+STAGES = ('invoke', 'invoke_cached', 'fingerprint', 'rotation', 'execute', 'execute_dimensions')
+PERCENTILES = (50, 90, 99)
+
+# Seconds the batch tweak of BATCH_SIZE cylinders should stay under
+BATCH_SIZE = 1000
+BATCH_TARGET = 3.0
+
+
+def import_addon():
+    """ The addon doesn't have to be installed, we import it straight from the folder this file is in """
+    addon_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.dirname(addon_dir))
+    package = os.path.basename(addon_dir)
+    return importlib.import_module(package + ".core"), importlib.import_module(package + ".fingerprint")
+
+
+def cases():
+    """ Parameters of every case in the grid, counts above what a primitive allows are clamped the way its operator would """
+
+    for count in COUNTS:
+        for fill in FILLS:
+            yield 'CIRCLE', dict(vertices=count, radius=1.0, cap_fill=fill, b_UV=True)
+            yield 'CYLINDER', dict(vertices=count, radius=1.0, depth=2.0, cap_fill=fill, b_UV=True)
+            yield 'CONE', dict(vertices=count, radius1=1.0, radius2=0.0, depth=2.0, cap_fill=fill, b_UV=True)
+
+        yield 'UV_SPHERE', dict(segments=count, rings=min(max(count//2, 3), 500), radius=1.0, b_UV=True)
+        yield 'TORUS', dict(major_segments=min(count, 256), minor_segments=max(min(count//4, 256), 3),
+                            major_radius=1.0, minor_radius=0.25, b_UV=True)
+
+    for subdivisions in range(1, 7):
+        yield 'ICOSPHERE', dict(subdivisions=subdivisions, radius=1.0, b_UV=True)
+
+
+def timed(function, *args):
+    start = perf_counter()
+    result = function(*args)
+    return perf_counter() - start, result
+
+
+def updated(function, *args):
+    """
+    Runs the function and evaluates the depsgraph after it, the viewport does the same before the user sees the result
+    Background mode never evaluates on its own, without this modifier stacks would cost nothing
+    """
+    import bpy
+
+    result = function(*args)
+    bpy.context.view_layer.update()
+    return result
+
+
+def summarize(times: list[float]) -> dict:
+    times = np.array(times)*1000
+    summary = {f"p{percentile}": float(np.percentile(times, percentile)) for percentile in PERCENTILES}
+    summary.update(min=float(times.min()), max=float(times.max()), mean=float(times.mean()))
+    return summary
+
+
+def run_case(core, fingerprint, primitive: str, parameters: dict, rotated: bool, modifiers: bool, repeats: int) -> dict:
+    """ Builds one primitive into a fresh object and times every stage on it """
+
+    import bpy
+    from mathutils import Vector, Euler, Matrix
+
+    names = {'CIRCLE': core.localization_circle, 'CYLINDER': core.localization_cylinder, 'CONE': core.localization_cone,
+             'UV_SPHERE': core.localization_sphere, 'TORUS': core.localization_torus, 'ICOSPHERE': core.localization_icosphere}
+    mesh = bpy.data.meshes.new(names[primitive])
+    ob = bpy.data.objects.new(names[primitive], mesh)
+    bpy.context.collection.objects.link(ob)
+
+    if modifiers:
+        ob.modifiers.new("Bevel", 'BEVEL')
+        ob.modifiers.new("Subdivision", 'SUBSURF')
+
+    def reset():
+        """ Puts the original primitive back, rotated and with the rotation applied if the case asks for it """
+        mesh[core.TOPOLOGY_KEY] = ""
+        core.replace_primitive(ob, primitive, parameters, Vector(), Euler(), 'WORLD', Vector())
+        if rotated:
+            mesh.transform(Euler((0.3, 0.7, 1.1)).to_matrix().to_4x4())
+            mesh.update()
+        ob.matrix_world = Matrix()
+
+        # Evaluated here so the timed stages only pay for what they change
+        bpy.context.view_layer.update()
+
+    reset()
+    times = {stage: [] for stage in STAGES}
+
+    for _ in range(repeats):
+
+        # Same work as invoke, with the depsgraph evaluation that follows it
+        # The cache entry is removed first so this is the full inference, the second call finds what the first stored
+        mesh.pop(core.cache.CACHE_KEY, None)
+        bpy.context.view_layer.update()
+        seconds, (inferred, location, rotation, origin, _) = timed(updated, core.infer_parameters, ob, primitive)
+        times['invoke'].append(seconds)
+        times['invoke_cached'].append(timed(updated, core.infer_parameters, ob, primitive)[0])
+        times['fingerprint'].append(timed(fingerprint.fingerprint, mesh)[0])
+
+        snap = core.MeshSnapshot(ob)
+        times['rotation'].append(timed(core.solve_rotation, snap, primitive)[0])
+
+        # A full rebuild, the stored topology is cleared so nothing gets reused
+        mesh[core.TOPOLOGY_KEY] = ""
+        times['execute'].append(timed(updated, core.replace_primitive, ob, primitive, inferred, location, rotation, 'WORLD', origin)[0])
+
+        # Dragging a size slider only moves the verts
+        resized = {key: value*1.1 if isinstance(value, float) else value for key, value in inferred.items()}
+        times['execute_dimensions'].append(
+            timed(updated, core.replace_primitive, ob, primitive, resized, location, rotation, 'WORLD', origin)[0])
+
+        reset()
+
+    result = {
+        "primitive": primitive,
+        "parameters": parameters,
+        "rotated": rotated,
+        "modifiers": modifiers,
+        "vertices": len(mesh.vertices),
+        "stages": {stage: summarize(values) for stage, values in times.items()},
+    }
+
+    bpy.data.objects.remove(ob)
+    bpy.data.meshes.remove(mesh)
+    return result
+
+
+def scaling(results: list[dict]) -> dict:
+    """ Slope of log(time) against log(vertex count) for every primitive and stage, 1 is linear and 2 quadratic """
+
+    slopes = {}
+    for primitive in sorted({result["primitive"] for result in results}):
+        of_type = [result for result in results if result["primitive"] == primitive]
+        vertices = np.log([result["vertices"] for result in of_type])
+        if np.ptp(vertices) == 0:
+            continue
+
+        slopes[primitive] = {}
+        for stage in STAGES:
+            times = np.log([max(result["stages"][stage]["p50"], 1e-6) for result in of_type])
+            slopes[primitive][stage] = float(np.polyfit(vertices, times, 1)[0])
+
+    return slopes
+
+
+def fingerprint_pool(core, fingerprint, meshes: int, repeats: int) -> dict:
+    """ Fingerprints of a batch of dense meshes, hashed one after the other and in a thread pool """
+
+    import bpy
+    from mathutils import Vector, Euler
+
+    objects = []
+    for _ in range(meshes):
+        mesh = bpy.data.meshes.new(core.localization_sphere)
+        ob = bpy.data.objects.new(core.localization_sphere, mesh)
+        core.replace_primitive(ob, 'UV_SPHERE', dict(segments=256, rings=128, radius=1.0, b_UV=True),
+                               Vector(), Euler(), 'WORLD', Vector())
+        objects.append(ob)
+
+    batch = [ob.data for ob in objects]
+    result = {
+        "meshes": meshes,
+        "vertices": len(batch[0].vertices),
+        "serial": summarize([timed(fingerprint.fingerprints, batch, 1)[0] for _ in range(repeats)]),
+        "pooled": summarize([timed(fingerprint.fingerprints, batch)[0] for _ in range(repeats)]),
+    }
+
+    for ob in objects:
+        mesh = ob.data
+        bpy.data.objects.remove(ob)
+        bpy.data.meshes.remove(mesh)
+    return result
+
+
+def batch(core, count: int, repeats: int) -> dict:
+    """
+    The work of the batch dialog on many cylinders: infer every one from its mesh and rebuild it with 16 segments
+    Cache entries are removed before every repeat, imported cylinders have never been inferred
+    """
+
+    import bpy
+    from mathutils import Vector, Euler
+
+    objects = []
+    for _ in range(count):
+        mesh = bpy.data.meshes.new(core.localization_cylinder)
+        ob = bpy.data.objects.new(core.localization_cylinder, mesh)
+        bpy.context.collection.objects.link(ob)
+        objects.append(ob)
+
+    def reset():
+        """ Puts back the 32 segment cylinders, in a grid, without anything stored on their meshes """
+        for index, ob in enumerate(objects):
+            location = Vector((index % 40*3, index // 40*3, 0))
+            core.replace_primitive(ob, 'CYLINDER', dict(vertices=32, radius=1.0, depth=2.0, cap_fill='NGON', b_UV=True),
+                                   location, Euler(), 'WORLD', location)
+            ob.data.pop(core.cache.CACHE_KEY, None)
+            ob.data[core.TOPOLOGY_KEY] = ""
+        bpy.context.view_layer.update()
+
+    def tweak():
+        for ob in objects:
+            parameters, location, rotation, origin, _ = core.infer_parameters(ob, 'CYLINDER')
+            parameters['vertices'] = 16
+            core.replace_primitive(ob, 'CYLINDER', parameters, location, rotation, 'WORLD', origin)
+        bpy.context.view_layer.update()
+
+    times = []
+    for _ in range(repeats):
+        reset()
+        times.append(timed(tweak)[0])
+
+    for ob in objects:
+        mesh = ob.data
+        bpy.data.objects.remove(ob)
+        bpy.data.meshes.remove(mesh)
+
+    seconds = float(np.median(times))
+    return {"cylinders": count, "target": BATCH_TARGET, "seconds": summarize(times), "per_cylinder_ms": seconds*1000/count,
+            "met": seconds <= BATCH_TARGET}
+
+
+def run(output: str, repeats: int) -> None:
+
+    import bpy
+
+    core, fingerprint = import_addon()
+    results = []
+    start = perf_counter()
+
+    for primitive, parameters in cases():
+        for rotated in (False, True):
+            for modifiers in (False, True):
+                results.append(run_case(core, fingerprint, primitive, parameters, rotated, modifiers, repeats))
+
+    report = {
+        "blender": bpy.app.version_string,
+        "repeats": repeats,
+        "seconds": perf_counter() - start,
+        "cases": results,
+        "scaling": scaling(results),
+        "fingerprint_pool": fingerprint_pool(core, fingerprint, 64, repeats),
+        "batch": batch(core, BATCH_SIZE, repeats),
+    }
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+
+    print(f"{len(results)} cases in {report['seconds']:.1f}s, written to {output}")
+    for primitive, stages in report["scaling"].items():
+        print(f"{primitive:>10} " + " ".join(f"{stage}={slope:.2f}" for stage, slope in stages.items()))
+
+    # How many times cheaper the check is than the inference it guards, the worst case over the whole grid
+    ratios = [case["stages"]["invoke"]["p50"]/max(case["stages"]["fingerprint"]["p50"], 1e-6) for case in results]
+    pool = report["fingerprint_pool"]
+    print(f"fingerprint is at least {min(ratios):.0f}x faster than inference, median {float(np.median(ratios)):.0f}x")
+    print(f"{pool['meshes']} meshes of {pool['vertices']} verts fingerprinted in {pool['serial']['p50']:.1f} ms, "
+          f"{pool['pooled']['p50']:.1f} ms in a thread pool")
+
+    result = report["batch"]
+    print(f"{result['cylinders']} cylinders tweaked in {result['seconds']['p50']/1000:.2f}s "
+          f"({result['per_cylinder_ms']:.2f} ms each), target {result['target']:.1f}s "
+          + ("met" if result["met"] else "MISSED"))
+
+
+def plot(path: str) -> None:
+    """ One chart per stage, median time against vertex count on log axes for every primitive type """
+
+    import matplotlib.pyplot as plt
+
+    with open(path) as file:
+        report = json.load(file)
+
+    figure, axes = plt.subplots(1, len(STAGES), figsize=(5*len(STAGES), 4.5))
+    for axis, stage in zip(axes, STAGES):
+        for primitive in sorted({case["primitive"] for case in report["cases"]}):
+            of_type = sorted((case for case in report["cases"] if case["primitive"] == primitive), key=lambda case: case["vertices"])
+            axis.loglog([case["vertices"] for case in of_type], [case["stages"][stage]["p50"] for case in of_type], ".-", label=primitive)
+
+        axis.set_title(stage)
+        axis.set_xlabel("vertices")
+        axis.set_ylabel("median ms")
+        axis.grid(True, which="both", alpha=0.3)
+    axes[0].legend()
+
+    figure.tight_layout()
+    output = os.path.splitext(path)[0] + ".png"
+    figure.savefig(output, dpi=120)
+    print(f"written to {output}")
+
+
+if __name__ == "__main__":
+    # Blender passes everything after "--" to the script, plain Python passes everything after the script name
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+
+    parser = argparse.ArgumentParser(description="Benchmark the RePrimitive hot paths")
+    parser.add_argument("--output", default="bench.json", help="where to write the JSON results")
+    parser.add_argument("--repeats", type=int, default=5, help="how many times every case is timed")
+    parser.add_argument("--plot", metavar="JSON", help="plot results from a previous run instead of running")
+    args = parser.parse_args(argv)
+
+    if args.plot:
+        plot(args.plot)
+    else:
+        run(args.output, args.repeats)
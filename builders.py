@@ -0,0 +1,419 @@
+from __future__ import annotations
+
+import numpy as np
+from functools import lru_cache
+from math import fmod, pi
+from typing import TYPE_CHECKING
+
+# Only writing into a mesh and the icosphere need Blender, the arrays themselves are plain NumPy and can be tested without it
+if TYPE_CHECKING:
+    import bpy
+
+# Every builder returns the same tuple of arrays:
+#   co     - vertex coordinates (V, 3)
+#   loops  - vertex index of every face corner, face after face
+#   starts - index of the first loop of every face
+#   edges  - pairs of vertex indices (E, 2)
+#   uvs    - UV of every loop (L, 2) or None when UVs weren't asked for
+# Vertices and faces come out in the same order Blender creates them in, so the result looks like the primitive operators made it
+
+
+def loop_starts(sizes: np.ndarray) -> np.ndarray:
+    """ Index of the first loop of every face from the number of corners they have """
+    if not len(sizes):
+        return np.empty(0, dtype=np.int32)
+    return np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.int32)
+
+
+def next_loops(starts: np.ndarray, loop_count: int) -> np.ndarray:
+    """ Index of the loop that comes after every loop in its own face """
+    following = np.arange(1, loop_count + 1)
+    ends = np.append(starts[1:], loop_count) - 1
+    following[ends] = starts
+    return following
+
+
+def edges_from_loops(loops: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """ Unique edges of all the faces, in the order faces first use them """
+    if not len(loops):
+        return np.empty((0, 2), dtype=np.int64)
+    a, b = loops, loops[next_loops(starts, len(loops))]
+    pairs = np.column_stack((np.minimum(a, b), np.maximum(a, b)))
+    _, first = np.unique(pairs[:, 0]*(loops.max() + 1) + pairs[:, 1], return_index=True)
+    return pairs[np.sort(first)]
+
+
+def interleave_faces(*blocks: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Puts row i of every block of faces before row i+1 of any block, the way the primitives create a few faces per segment
+    Returns the loops and the number of corners of every face
+    """
+    loops = np.concatenate(blocks, axis=1).ravel()
+    sizes = np.tile([block.shape[1] for block in blocks], len(blocks[0]))
+    return loops, sizes
+
+
+def weld(co: np.ndarray, loops: np.ndarray, sizes: np.ndarray, uvs: np.ndarray) -> tuple:
+    """
+    Merges verts that ended up in the same spot, same as Blender does when a cone has a radius of 0
+    The first vert keeps its place, faces lose the corners that merged and disappear if they have less than 3 left
+    Also returns the edges the faces leave behind, with both radii at 0 every face collapses and only those remain
+    """
+
+    _, first, inverse = np.unique(co.round(6), axis=0, return_index=True, return_inverse=True)
+    merged = first[inverse.ravel()]
+    kept = np.unique(merged)
+    loops = merged[loops]
+
+    # Edges that didn't merge into a single vert
+    starts = loop_starts(sizes)
+    edges = edges_from_loops(loops, starts)
+    edges = np.searchsorted(kept, edges[edges[:, 0] != edges[:, 1]])
+
+    # Drop the corners that are the same vertex as the next corner in the face
+    keep = loops != loops[next_loops(starts, len(loops))]
+    faces = np.repeat(np.arange(len(sizes)), sizes)
+    sizes = np.bincount(faces[keep], minlength=len(sizes))
+    keep &= (sizes >= 3)[faces]
+    sizes = sizes[sizes >= 3]
+
+    loops = np.searchsorted(kept, loops[keep])
+    uvs = uvs[keep] if uvs is not None else None
+    return co[kept], loops, sizes, uvs, edges
+
+
+def circle_uvs(co: np.ndarray, loops: np.ndarray, radius: float, center: tuple, scale: float, mirror: bool = False) -> np.ndarray:
+    """ Projects the corners straight down onto a circle in UV space, used for caps """
+    scale = scale/radius if radius else scale
+    x, y = co[loops, 0]*scale, co[loops, 1]*scale
+    return np.column_stack((center[0] - x if mirror else center[0] + x, center[1] + y))
+
+
+def build_circle(vertices: int, radius: float, fill_type: str, calc_uvs: bool) -> tuple:
+
+    # Going this way ends up with the normal facing up
+    phi = 2*pi*np.arange(vertices)/vertices
+    co = np.column_stack((-radius*np.sin(phi), radius*np.cos(phi), np.zeros(vertices)))
+    ring = np.arange(vertices)
+
+    if fill_type == 'NOTHING':
+        edges = np.column_stack((ring, np.roll(ring, 1)))
+        edges = np.roll(edges, -1, axis=0)
+        # No faces means no UVs, the UV map still has to be there
+        uvs = np.empty((0, 2)) if calc_uvs else None
+        return co, np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32), edges, uvs
+
+    if fill_type == 'TRIFAN':
+        # Middle vert is created first
+        co = np.vstack(((0, 0, 0), co))
+        ring += 1
+        loops = np.column_stack((np.zeros(vertices, dtype=int), ring, np.roll(ring, -1))).ravel()
+        sizes = np.full(vertices, 3)
+    else:
+        loops, sizes = ring, np.array([vertices])
+
+    starts = loop_starts(sizes)
+    uvs = circle_uvs(co, loops, radius, (0.5, 0.5), 0.5) if calc_uvs else None
+
+    return co, loops, starts, edges_from_loops(loops, starts), uvs
+
+
+def build_cone(vertices: int, radius1: float, radius2: float, depth: float, fill_type: str, calc_uvs: bool) -> tuple:
+    """ Cylinders are cones with both radii the same """
+
+    half = depth/2
+    phi = 2*pi*np.arange(vertices)/vertices
+    bottom = np.column_stack((radius1*np.sin(phi), radius1*np.cos(phi), np.full(vertices, -half)))
+    top = np.column_stack((radius2*np.sin(phi), radius2*np.cos(phi), np.full(vertices, half)))
+
+    # Middle verts come first, after them bottom and top verts take turns
+    trifan = fill_type == 'TRIFAN'
+    offset = 2 if trifan else 0
+    co = np.stack((bottom, top), axis=1).reshape(-1, 3)
+    if trifan:
+        co = np.vstack(((0, 0, -half), (0, 0, half), co))
+
+    b = offset + 2*np.arange(vertices)
+    t = b + 1
+
+    # Every segment connects the previous vert with the current one, the one closing the ring comes last
+    prev, cur = np.arange(vertices), np.roll(np.arange(vertices), -1)
+    sides = np.column_stack((b[prev], t[prev], t[cur], b[cur]))
+
+    if trifan:
+        bottom_fan = np.column_stack((np.zeros(vertices, dtype=int), b[prev], b[cur]))
+        top_fan = np.column_stack((np.ones(vertices, dtype=int), t[cur], t[prev]))
+        loops, sizes = interleave_faces(bottom_fan, top_fan, sides)
+    else:
+        loops, sizes = sides.ravel(), np.full(vertices, 4)
+
+    # Dissolving the fans leaves the caps after the sides
+    if fill_type == 'NGON':
+        loops = np.concatenate((loops, b, np.roll(t[::-1], 1)))
+        sizes = np.append(sizes, (vertices, vertices))
+
+    # Side quads are every third face with fans and the first faces otherwise
+    sides = np.zeros(len(sizes), dtype=bool)
+    if trifan:
+        sides[2::3] = True
+    else:
+        sides[:vertices] = True
+
+    uvs = cone_uvs(co, loops, sizes, sides, vertices, radius1, radius2, fill_type != 'NOTHING') if calc_uvs else None
+
+    # Ends with a radius of 0 collapse into a single vert
+    edges = None
+    if not radius1 or not radius2:
+        co, loops, sizes, uvs, edges = weld(co, loops, sizes, uvs)
+
+    # With both radii at 0 no face is left, the sides leave a single edge from the bottom to the top behind
+    starts = loop_starts(sizes)
+    if edges is None or len(sizes):
+        edges = edges_from_loops(loops, starts)
+    return co, loops, starts, edges, uvs
+
+
+def cone_uvs(co: np.ndarray, loops: np.ndarray, sizes: np.ndarray, sides: np.ndarray, vertices: int, radius1: float, radius2: float, caps: bool) -> np.ndarray:
+    """
+    Side quads are unwrapped into a strip, caps into circles, with caps the strip takes the upper half and the caps sit below it
+    A cone with a sharp tip has no strip, its sides are projected like a cap instead
+    """
+
+    height = 0.5 if caps else 1.0
+    center_y = 0.25 if caps else 0.5
+    center_top = 0.25 if caps else 0.5
+    center_bottom = 0.75 if caps else 0.5
+    radius = 0.24 if caps else 0.5
+
+    # Using the scale of the other end lets us handle cones with a sharp tip
+    scale_top = radius/radius2 if radius2 else (radius/radius1 if radius1 else radius)
+    scale_bottom = radius/radius1 if radius1 else scale_top
+
+    uvs = np.empty((len(loops), 2))
+    faces = np.repeat(np.arange(len(sizes)), sizes)
+    starts = loop_starts(sizes)
+
+    # Every side quad starts on the bottom of the previous segment, goes up, over to the current segment and back down
+    side = sides & bool(radius1) & bool(radius2)
+    side_loops = np.flatnonzero(side[faces])
+    if len(side_loops):
+        segment = np.cumsum(side) - 1
+        corner = side_loops - starts[faces[side_loops]]
+        x = 1.0 - (segment[faces[side_loops]] + (corner >= 2))/vertices
+        y = 1.0 - height + height*((corner == 1) | (corner == 2))
+        uvs[side_loops] = np.column_stack((x, y))
+
+    # Everything else is a cap(or a side of a sharp cone), projected onto the circle of the end it faces
+    cap_loops = np.flatnonzero(~side[faces])
+    if len(cap_loops):
+        v0 = co[loops[starts]]
+        v1 = co[loops[starts + 1]]
+        v2 = co[loops[starts + 2]]
+        facing_up = np.cross(v1 - v0, v2 - v0)[:, 2] > 0
+
+        up = cap_loops[facing_up[faces[cap_loops]]]
+        down = cap_loops[~facing_up[faces[cap_loops]]]
+        uvs[up] = circle_uvs(co, loops[up], 1, (center_top, center_y), scale_top)
+        uvs[down] = circle_uvs(co, loops[down], 1, (center_bottom, center_y), scale_bottom, mirror=True)
+
+    return uvs
+
+
+def build_cylinder(vertices: int, radius: float, depth: float, fill_type: str, calc_uvs: bool) -> tuple:
+    return build_cone(vertices, radius, radius, depth, fill_type, calc_uvs)
+
+
+def build_uv_sphere(segments: int, rings: int, radius: float, calc_uvs: bool) -> tuple:
+    """
+    Blender makes one half circle from the top pole to the bottom one and spins copies of it around Z, merging the poles
+    Verts of the first half circle keep their place, every copy after it only adds its ring verts
+    """
+
+    phi = pi*np.arange(rings + 1)/rings
+    alpha = 2*pi*np.arange(segments)/segments
+
+    # Negative rotation makes the normals face outward
+    meridians = np.empty((segments, rings + 1, 3))
+    meridians[:, :, 0] = np.outer(np.sin(alpha), np.sin(phi))*radius
+    meridians[:, :, 1] = np.outer(np.cos(alpha), np.sin(phi))*radius
+    meridians[:, :, 2] = np.cos(phi)*radius
+
+    co = np.vstack((meridians[0], meridians[1:, 1:-1].reshape(-1, 3)))
+
+    # Index of the vert at ring a of the half circle k
+    index = np.empty((segments + 1, rings + 1), dtype=np.int64)
+    index[0] = np.arange(rings + 1)
+    index[1:segments, 1:-1] = rings + 1 + np.arange((segments - 1)*(rings - 1)).reshape(segments - 1, rings - 1)
+    index[1:segments, 0], index[1:segments, -1] = 0, rings
+    index[segments] = index[0]
+
+    # Faces between half circle k and k+1, going down from the top pole
+    k, a = np.meshgrid(np.arange(segments), np.arange(1, rings + 1), indexing='ij')
+    k, a = k.ravel(), a.ravel()
+    quads = np.column_stack((index[k, a - 1], index[k + 1, a - 1], index[k + 1, a], index[k, a]))
+
+    # Faces touching a pole are triangles, the corner that merged into the pole goes away
+    top, bottom = a == 1, a == rings
+    sizes = np.where(top | bottom, 3, 4)
+    keep = np.ones(quads.shape, dtype=bool)
+    keep[top, 0] = False
+    keep[bottom, 3] = False
+    loops = quads[keep]
+
+    starts = loop_starts(sizes)
+    uvs = sphere_uvs(co, loops, starts, sizes) if calc_uvs else None
+
+    return co, loops, starts, edges_from_loops(loops, starts), uvs
+
+
+def sphere_uvs(co: np.ndarray, loops: np.ndarray, starts: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+    """
+    Longitude and latitude of every corner, faces crossing the seam get moved over by 1
+    Poles don't have a longitude so they take the middle of the two other corners of their triangle
+    """
+
+    x, y, z = co[loops].T
+    length = np.linalg.norm(co[loops], axis=1)
+    u = 0.5 + np.arctan2(y, x)/(2*pi)
+    v = 0.5 + np.arcsin(np.clip(z/np.where(length, length, 1), -1, 1))/pi
+
+    faces = np.repeat(np.arange(len(sizes)), sizes)
+    u_max = np.maximum.reduceat(u, starts)[faces]
+    u = np.where(u_max - u > 0.5, u + 1, u)
+
+    # Poles sit on the Z axis
+    pole = (np.abs(x) < 1e-6) & (np.abs(y) < 1e-6)
+    if np.any(pole):
+        totals = np.bincount(faces, np.where(pole, 0, u))
+        u[pole] = totals[faces[pole]]/2
+
+    return np.column_stack((u - u.min(), v))
+
+
+@lru_cache(maxsize=8)
+def unit_icosphere(subdivisions: int, calc_uvs: bool) -> tuple:
+    """
+    Icosphere with a radius of 1, made by bmesh since its vertex order comes from subdividing edges
+    Changing the radius only scales the verts so we build every subdivision level once
+    """
+
+    import bmesh
+    from mathutils import Matrix
+
+    bm = bmesh.new()
+    if calc_uvs:
+        bm.loops.layers.uv.new()
+    bmesh.ops.create_icosphere(bm, subdivisions=subdivisions, radius=1.0, matrix=Matrix(), calc_uvs=calc_uvs)
+    bm.verts.index_update()
+
+    co = np.array([v.co for v in bm.verts])
+    edges = np.array([(e.verts[0].index, e.verts[1].index) for e in bm.edges])
+    loops = np.array([v.index for f in bm.faces for v in f.verts])
+    sizes = np.array([len(f.verts) for f in bm.faces])
+
+    uvs = None
+    if calc_uvs:
+        layer = bm.loops.layers.uv.active
+        uvs = np.array([l[layer].uv for f in bm.faces for l in f.loops])
+
+    bm.free()
+    return co, loops, loop_starts(sizes), edges, uvs
+
+
+def build_icosphere(subdivisions: int, radius: float, calc_uvs: bool) -> tuple:
+    co, loops, starts, edges, uvs = unit_icosphere(subdivisions, calc_uvs)
+    return co*radius, loops, starts, edges, uvs
+
+
+def build_torus(major_segments: int, minor_segments: int, major_radius: float, minor_radius: float, calc_uvs: bool) -> tuple:
+    """ Same layout as Blender's torus operator, one ring of minor segments after the other going around Z """
+
+    beta = 2*pi*np.arange(major_segments)/major_segments
+    alpha = 2*pi*np.arange(minor_segments)/minor_segments
+
+    distance = major_radius + np.cos(alpha)*minor_radius
+    co = np.empty((major_segments, minor_segments, 3))
+    co[:, :, 0] = np.outer(np.cos(beta), distance)
+    co[:, :, 1] = np.outer(np.sin(beta), distance)
+    co[:, :, 2] = np.sin(alpha)*minor_radius
+    co = co.reshape(-1, 3)
+
+    i, j = np.meshgrid(np.arange(major_segments), np.arange(minor_segments), indexing='ij')
+    i_next, j_next = (i + 1) % major_segments, (j + 1) % minor_segments
+    loops = np.stack((i*minor_segments + j, i_next*minor_segments + j,
+                      i_next*minor_segments + j_next, i*minor_segments + j_next), axis=-1).ravel()
+    starts = np.arange(0, len(loops), 4, dtype=np.int32)
+
+    uvs = torus_uvs(major_segments, minor_segments) if calc_uvs else None
+
+    return co, loops, starts, edges_from_loops(loops, starts), uvs
+
+
+def torus_uvs(major_segments: int, minor_segments: int) -> np.ndarray:
+    """ Grid of UVs, steps are rounded so segments that aren't divisible by 4 still line up """
+
+    def steps(count: int) -> np.ndarray:
+        step = 1.0/count
+        value = 0.5 + fmod(0.5, step)
+
+        # Wrap under 1.0 to prevent float precision errors wrapping at the wrong step
+        wrap = 1.0 - step/2.0
+        values = []
+        for _ in range(count):
+            values.append(value)
+            value = value + step - 1.0 if value + step > wrap else value + step
+        return np.array(values), step
+
+    u, u_step = steps(major_segments)
+    v, v_step = steps(minor_segments)
+    u, v = np.meshgrid(u, v, indexing='ij')
+    u, v = u.ravel(), v.ravel()
+
+    return np.stack((np.column_stack((u, v)), np.column_stack((u + u_step, v)),
+                     np.column_stack((u + u_step, v + v_step)), np.column_stack((u, v + v_step))), axis=1).reshape(-1, 2)
+
+
+def write_geometry(mesh: bpy.types.Mesh, geometry: tuple, smooth: bool) -> None:
+    """ Replaces all the geometry of the mesh with the built arrays, materials and the mesh name stay """
+
+    co, loops, starts, edges, uvs = geometry
+
+    # Clearing the geometry removes the UV map too, the new one gets the same name
+    uv_name = mesh.uv_layers.active.name if mesh.uv_layers.active else "UVMap"
+    mesh.clear_geometry()
+
+    mesh.vertices.add(len(co))
+    mesh.vertices.foreach_set('co', co.astype(np.float32).ravel())
+
+    mesh.edges.add(len(edges))
+    mesh.edges.foreach_set('vertices', edges.astype(np.int32).ravel())
+
+    # Every loop needs the edge going to the next loop of its face, we look it up in the sorted edge keys
+    if len(loops):
+        following = loops[next_loops(starts, len(loops))]
+        width = len(co)
+        keys = np.minimum(edges[:, 0], edges[:, 1])*width + np.maximum(edges[:, 0], edges[:, 1])
+        order = np.argsort(keys)
+        loop_keys = np.minimum(loops, following)*width + np.maximum(loops, following)
+        edge_index = order[np.searchsorted(keys[order], loop_keys)]
+
+        mesh.loops.add(len(loops))
+        mesh.loops.foreach_set('vertex_index', loops.astype(np.int32))
+        mesh.loops.foreach_set('edge_index', edge_index.astype(np.int32))
+
+        mesh.polygons.add(len(starts))
+        mesh.polygons.foreach_set('loop_start', starts.astype(np.int32))
+        mesh.polygons.foreach_set('use_smooth', np.full(len(starts), smooth))
+
+    # Geometry without faces still gets the UV map, the same as the primitive operators make it
+    if uvs is not None:
+        layer = mesh.uv_layers.active or mesh.uv_layers.new(name=uv_name)
+        layer.data.foreach_set('uv', uvs.astype(np.float32).ravel())
+
+    mesh.update()
+
+
+def write_positions(mesh: bpy.types.Mesh, co: np.ndarray) -> None:
+    """ Moves the verts of a mesh that already has the right faces, one foreach_set instead of rebuilding everything """
+    mesh.vertices.foreach_set('co', co.astype(np.float32).ravel())
+    mesh.update()
@@ -0,0 +1,122 @@
+"""
+Parameters inference found, stored on the mesh so the next invoke can skip the inference
+The entry is only used while the fingerprint of the geometry and the object scale it was measured with still match
+It lives in a custom property of the mesh so it's saved with the file, copied with the mesh and restored by undo
+Entries of meshes whose geometry changes are checked again right away, a stale one is removed before anything reads it
+"""
+
+import bpy
+from bpy.app.handlers import persistent
+import numpy as np
+from mathutils import Vector, Euler, Matrix
+from .fingerprint import fingerprint
+
+# Custom property on the mesh that holds the last inference
+CACHE_KEY = "_reprimitive_cache"
+
+
+def local_scale(ob: bpy.types.Object) -> np.ndarray:
+    """ Scale and shear part of the world matrix, the same one MeshSnapshot measures with """
+    matrix_world = ob.matrix_world
+    rotation = matrix_world.to_quaternion().to_matrix()
+    return np.array(rotation.transposed() @ matrix_world.to_3x3())
+
+
+# Scale differences smaller than this are float noise of decomposing the matrix
+SCALE_TOLERANCE = 1e-6
+
+# Meshes rebuilt since the last depsgraph update, their fingerprint was just taken from the geometry the update is about
+fresh = set()
+
+
+def geometry_hash(ob: bpy.types.Object) -> str:
+    """ Fingerprint of the mesh, the scale is stored next to it so the entry can be checked without the object """
+    return fingerprint(ob.data)
+
+
+def store(ob: bpy.types.Object, primitive: str, digest: str, parameters: dict, rotation: np.ndarray, center: np.ndarray,
+          applied_rotation: bool, rebuilt: bool = False) -> None:
+    """
+    Remembers what inference found, rotation is the one the mesh was created with and center is measured without it
+    rebuilt tells that we just wrote the geometry, the depsgraph update that follows doesn't have to check it again
+    """
+
+    # Meshes linked from another file can't take custom properties, those are inferred every time
+    if ob.data.library is not None:
+        return
+
+    if rebuilt:
+        fresh.add(ob.data.as_pointer())
+
+    # Custom properties only take plain Python numbers, some inferred counts are NumPy ones
+    ob.data[CACHE_KEY] = {
+        'hash': digest,
+        'primitive': primitive,
+        'parameters': {name: value.item() if isinstance(value, np.generic) else value
+                       for name, value in parameters.items() if name != 'b_UV'},
+        'rotation': [float(value) for value in np.ravel(rotation)],
+        'center': [float(value) for value in center],
+        'scale': [float(value) for value in np.ravel(local_scale(ob))],
+        'applied_rotation': applied_rotation,
+    }
+
+
+def load(ob: bpy.types.Object, primitive: str, digest: str) -> tuple[dict, Vector, Euler, Vector, bool]:
+    """
+    Same return as infer_parameters if the stored entry still matches the mesh, None otherwise
+    Placement comes from the object, so moving or rotating the object doesn't invalidate anything
+    """
+
+    entry = ob.data.get(CACHE_KEY)
+    if entry is None or entry.get('hash') != digest or entry.get('primitive') != primitive:
+        return None
+
+    # Inference measures the mesh scaled, the same mesh on an object with another scale has other parameters
+    if not np.allclose(np.array(entry['scale']).reshape(3, 3), local_scale(ob), atol=SCALE_TOLERANCE):
+        return None
+
+    parameters = entry['parameters'].to_dict()
+    parameters['b_UV'] = bool(ob.data.uv_layers)
+
+    # Same as reorienting the snapshot, the rotation the mesh was created with moves over to the object
+    matrix_world = ob.matrix_world
+    rotation = np.array(matrix_world.to_quaternion().to_matrix()) @ np.array(entry['rotation']).reshape(3, 3)
+    translation = np.array(matrix_world.translation)
+
+    location = Vector(translation + rotation @ np.array(entry['center']))
+    rotation_euler = Matrix(rotation.tolist()).to_euler('XYZ', ob.rotation_euler)
+
+    return parameters, location, rotation_euler, Vector(translation), bool(entry['applied_rotation'])
+
+
+def revalidate(mesh: bpy.types.Mesh) -> None:
+    """ Removes the entry of a mesh if its geometry doesn't match the fingerprint anymore """
+    if mesh.library is None and mesh[CACHE_KEY].get('hash') != fingerprint(mesh):
+        del mesh[CACHE_KEY]
+
+
+@persistent
+def revalidate_updated(scene, depsgraph) -> None:
+    """
+    Checks the entries of meshes whose geometry just changed, runs after every depsgraph update so it only looks at what was updated
+    Only mesh updates count, an object under an armature or with an animated modifier updates its geometry every frame
+    while its base mesh, the one we fingerprint, stays the same
+    """
+
+    for update in depsgraph.updates:
+        if not update.is_updated_geometry:
+            continue
+
+        # Edits to the base mesh, leaving edit mode included, come as updates of the mesh itself, as evaluated copies
+        # A rebuild stamps the mesh right before its update arrives here, that fingerprint is already the current one
+        mesh = update.id.original
+        if not isinstance(mesh, bpy.types.Mesh) or CACHE_KEY not in mesh or mesh.as_pointer() in fresh:
+            continue
+
+        # Edit mode keeps its changes away from the mesh until it's left, leaving it is another geometry update
+        if mesh.is_editmode:
+            continue
+
+        revalidate(mesh)
+
+    fresh.clear()
@@ -0,0 +1,288 @@
+"""
+Bulk RePrimitive for .blend files, meant for asset pipelines that run Blender without a UI
+
+    python cli.py --rules rules.json --jobs 4 --output-dir out/ --report report.json scenes/*.blend
+
+Every file is opened by its own Blender worker in background mode, primitives that match a rule are rebuilt and the file is saved
+The rules file is JSON, every rule can filter by primitive type and object name, rules that match are applied in order:
+
+    {"rules": [
+        {"primitive": "CYLINDER", "set": {"vertices": 16, "b_UV": true}},
+        {"primitive": "UV_SPHERE", "name": "Rivet*", "offset": {"segments": -8}, "factor": {"radius": 0.5}}
+    ]}
+
+"set" replaces values, "offset" adds to counts and "factor" multiplies sizes, same as the batch dialog
+Results are clamped to the limits of the tweak operators, an offset on a size or a factor on a count is an error
+So is a key no rule or primitive has, every worker checks the rules before it opens its file
+Every object is matched by its own name, linked duplicates that no rule matches keep the mesh they had
+"""
+
+import argparse
+import fnmatch
+import importlib
+import json
+import numbers
+import os
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+
+# What a rule can have, anything else is most likely a typo that would otherwise be ignored
+RULE_KEYS = ("primitive", "name", "set", "offset", "factor")
+
+
+def validate_rules(rules: list[dict], parameters: dict = None) -> None:
+    """
+    Raises ValueError for a rule that can't do what it says, before any file is opened
+    parameters has the parameter names of every primitive type(api.PARAMETERS), only Blender can tell us those
+    so without them only the keys of the rules themselves are checked
+    A rule without a primitive can change anything that at least one primitive type has
+    """
+
+    for number, rule in enumerate(rules, 1):
+        unknown = rule.keys() - set(RULE_KEYS)
+        if unknown:
+            raise ValueError(f"rule {number} has unknown keys {', '.join(sorted(unknown))}")
+
+        if parameters is None:
+            continue
+
+        primitive = rule.get("primitive")
+        if primitive is not None and primitive not in parameters:
+            raise ValueError(f"rule {number} is for {primitive}, which isn't a primitive type")
+
+        names = set(parameters[primitive]) if primitive else set().union(*parameters.values())
+        for change in ("set", "offset", "factor"):
+            unknown = rule.get(change, {}).keys() - names
+            if unknown:
+                raise ValueError(f"rule {number} can't {change} {', '.join(sorted(unknown))} of {primitive or 'any primitive'}")
+
+
+def load_rules(path: str, parameters: dict = None) -> list[dict]:
+    with open(path) as file:
+        rules = json.load(file)["rules"]
+    validate_rules(rules, parameters)
+    return rules
+
+
+def rule_matches(rule: dict, name: str, primitive: str) -> bool:
+    return rule.get("primitive", primitive) == primitive and fnmatch.fnmatchcase(name, rule.get("name", "*"))
+
+
+def is_count(value) -> bool:
+    """ Inferred counts can be NumPy integers, bools are integers too but they're switches """
+    return isinstance(value, numbers.Integral) and not isinstance(value, bool)
+
+
+def apply_rules(rules: list[dict], name: str, parameters: dict, clamp) -> bool:
+    """
+    Changes the parameters by every rule that matches, returns False if none did
+    clamp(primitive, key, value) limits every result the way the tweak operator would
+    """
+
+    primitive = parameters["primitive"]
+    matched = False
+    for rule in rules:
+        if not rule_matches(rule, name, primitive):
+            continue
+        matched = True
+
+        for key, value in rule.get("set", {}).items():
+            parameters[key] = clamp(primitive, key, value)
+        for key, value in rule.get("offset", {}).items():
+            if not is_count(parameters[key]):
+                raise ValueError(f"offset only works on counts, {key} needs a factor")
+            parameters[key] = clamp(primitive, key, parameters[key] + value)
+        for key, value in rule.get("factor", {}).items():
+            if isinstance(parameters[key], numbers.Integral) or not isinstance(parameters[key], numbers.Real):
+                raise ValueError(f"factor only works on sizes, {key} needs an offset")
+            parameters[key] = clamp(primitive, key, parameters[key] * value)
+
+    return matched
+
+
+# Worker side, runs inside Blender---------------------------------------------------------------------------------------------------------------------
+
+def import_api():
+    """ The addon doesn't have to be installed, we import it straight from the folder this file is in """
+    addon_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.dirname(addon_dir))
+    return importlib.import_module(os.path.basename(addon_dir) + ".api")
+
+
+def process_file(api, rules: list[dict]) -> tuple[int, int, list[str]]:
+    """
+    Rebuilds every primitive of the open file that a rule matches
+    Linked duplicates share a mesh, every user is matched on its own name and users that end up with the same parameters
+    share one rebuilt mesh, moved over to it in their own space, users no rule matches keep the old mesh
+    Returns how many primitives were found and rebuilt and the errors of the ones that failed
+    """
+
+    import bpy
+
+    found = rebuilt = 0
+    errors = []
+    users = {}
+    for ob in bpy.data.objects:
+        if ob.type == 'MESH' and api.primitive_type(ob):
+            users.setdefault(ob.data, []).append(ob)
+
+    for mesh, objects in users.items():
+        found += len(objects)
+
+        # Users whose rules give the same parameters are rebuilt together, the cache makes inferring the duplicates cheap
+        groups = {}
+        for ob in objects:
+            try:
+                parameters = api.infer(ob)
+                if not apply_rules(rules, ob.name, parameters, api.clamp_parameter):
+                    continue
+            except Exception as error:
+                errors.append(f"{ob.name}: {error}")
+                continue
+
+            key = tuple(sorted((name, value) for name, value in parameters.items() if name not in api.PLACEMENT))
+            groups.setdefault(key, []).append((ob, parameters))
+
+        rebuilt_mesh = None
+        for group in groups.values():
+            (ob, parameters), *duplicates = group
+
+            try:
+                old_matrix = ob.matrix_world.copy()
+                api.rebuild(ob, parameters)
+
+                # Whatever moved the mesh into the space of the rebuilt object does the same for every duplicate
+                change = old_matrix.inverted() @ ob.matrix_world
+                for duplicate, _ in duplicates:
+                    duplicate.data = ob.data
+                    duplicate.matrix_world = duplicate.matrix_world @ change
+
+                rebuilt_mesh = ob.data
+                rebuilt += len(group)
+            except Exception as error:
+                errors.append(f"{ob.name}: {error}")
+
+        # Once every user got a copy of its own the old mesh is left without users
+        # We recognize primitives by their mesh name so a copy takes over the name of the old mesh
+        if rebuilt_mesh is not None and rebuilt_mesh is not mesh and not mesh.users:
+            name = mesh.name
+            bpy.data.meshes.remove(mesh)
+            rebuilt_mesh.name = name
+
+    return found, rebuilt, errors
+
+
+def run_worker(argv: list[str]) -> None:
+    """ Opens one file, processes it, saves it and writes what happened to the result file """
+
+    import bpy
+
+    source, output, rules_path, result_path = argv
+    result = {"file": source, "output": output, "status": "ok", "seconds": {}}
+    start = perf_counter()
+
+    try:
+        api = import_api()
+        rules = load_rules(rules_path, api.PARAMETERS)
+
+        bpy.ops.wm.open_mainfile(filepath=source)
+        loaded = perf_counter()
+
+        result["primitives"], result["rebuilt"], result["errors"] = process_file(api, rules)
+        processed = perf_counter()
+
+        bpy.ops.wm.save_as_mainfile(filepath=output)
+        saved = perf_counter()
+
+        result["seconds"] = {"load": loaded - start, "process": processed - loaded, "save": saved - processed}
+        if result["errors"]:
+            result["status"] = "partial"
+    except Exception as error:
+        result["status"] = "error"
+        result["error"] = str(error)
+
+    with open(result_path, "w") as file:
+        json.dump(result, file)
+
+
+# Pool side, runs in plain Python---------------------------------------------------------------------------------------------------------------------
+
+def run_file(blender: str, source: str, output: str, rules: str) -> dict:
+    """ Runs one Blender worker and returns its result, a worker that crashed gets a result made from its output """
+
+    with tempfile.TemporaryDirectory() as directory:
+        result_path = os.path.join(directory, "result.json")
+        command = [blender, "--background", "--factory-startup", "--python", os.path.abspath(__file__),
+                   "--", "worker", source, output, rules, result_path]
+
+        start = perf_counter()
+        process = subprocess.run(command, capture_output=True, text=True)
+        elapsed = perf_counter() - start
+
+        if os.path.exists(result_path):
+            with open(result_path) as file:
+                result = json.load(file)
+        else:
+            result = {"file": source, "output": output, "status": "crashed", "seconds": {},
+                      "error": process.stderr[-2000:] or process.stdout[-2000:]}
+
+    result["seconds"]["total"] = elapsed
+    return result
+
+
+def main(argv: list[str]) -> int:
+
+    parser = argparse.ArgumentParser(description="Rebuild primitives in .blend files according to a rules file")
+    parser.add_argument("files", nargs="+", help=".blend files to process")
+    parser.add_argument("--rules", required=True, help="JSON rules file")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="how many Blender workers run at once")
+    parser.add_argument("--blender", default="blender", help="path to the Blender executable")
+    parser.add_argument("--report", default="reprimitive_report.json", help="where to write the report")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--output-dir", help="save the processed files here, under their own names")
+    target.add_argument("--in-place", action="store_true", help="overwrite the original files")
+    args = parser.parse_args(argv)
+
+    # Fail before starting any worker if the rules don't load, parameter names are checked by the workers once they have the addon
+    load_rules(args.rules)
+    rules = os.path.abspath(args.rules)
+
+    jobs = []
+    for source in map(os.path.abspath, args.files):
+        output = source if args.in_place else os.path.join(os.path.abspath(args.output_dir), os.path.basename(source))
+        jobs.append((source, output))
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    # Every worker is its own Blender process, threads only wait for them
+    start = perf_counter()
+    with ThreadPoolExecutor(max_workers=max(args.jobs, 1)) as pool:
+        results = list(pool.map(lambda job: run_file(args.blender, job[0], job[1], rules), jobs))
+
+    report = {
+        "files": results,
+        "seconds": perf_counter() - start,
+        "rebuilt": sum(result.get("rebuilt", 0) for result in results),
+        "failed": [result["file"] for result in results if result["status"] not in ("ok", "partial")],
+    }
+    with open(args.report, "w") as file:
+        json.dump(report, file, indent=2)
+
+    for result in results:
+        print(f"{result['status']:>8} {result['seconds']['total']:7.2f}s {result.get('rebuilt', 0):6} {result['file']}")
+    print(f"{report['rebuilt']} primitives rebuilt in {report['seconds']:.2f}s, report written to {args.report}")
+
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    # Blender passes everything after "--" to the script, plain Python passes everything after the script name
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    if argv and argv[0] == "worker":
+        run_worker(argv[1:])
+    else:
+        sys.exit(main(argv))
@@ -1,1122 +1,480 @@
-from collections import defaultdict
-from itertools import chain
 import bpy
-import bmesh
+import numpy as np
 from .localization import *
-from math import cos, pi
-from mathutils import Vector, Euler, Quaternion
+from . import cache, stats
+from .snapshot import MeshSnapshot
+from .builders import build_circle, build_cone, build_cylinder, build_icosphere, build_torus, build_uv_sphere, write_geometry, write_positions
+from .solver import solve_rotation, solve_selection_rotation, find_symmetry_axis, find_poles, vertex_degrees, bin_keys, LEVEL_TOLERANCE
+from math import log
+from mathutils import Vector, Euler, Matrix
 
 TOLERANCE = 1e-5
 
+# Custom property on the mesh that remembers which topology we last built into it
+TOPOLOGY_KEY = "_reprimitive_topology"
 
-def vector_distance(point1: Vector, point2: Vector) -> float:
-    return (point2 - point1).length
 
+def primitive_type(ob: bpy.types.Object) -> str:
+    """ Which primitive the object is, judging by its mesh name, returns an empty string for anything else """
+    name = ob.data.name.lower()
 
-def vectors_are_same(point1: Vector, point2: Vector) -> bool:
-    """ Check if two vectors are the same within a certain tolerance """
-    return vector_distance(point1, point2) <= TOLERANCE
+    if name.startswith(localization_cylinder.lower()):
+        return 'CYLINDER'
+    elif name.startswith(localization_cone.lower()):
+        return 'CONE'
+    elif name.startswith(localization_circle.lower()):
+        return 'CIRCLE'
+    elif name.startswith(localization_torus.lower()):
+        return 'TORUS'
+    elif name.startswith(localization_sphere.lower()):
+        return 'UV_SPHERE'
+    elif name.startswith(localization_icosphere.lower()):
+        return 'ICOSPHERE'
+    return ''
 
 
-def float_distance(c1: Vector, c2: Vector) -> float:
-    return abs(c1 - c2)
+def calculate_circle_radius(snap: MeshSnapshot) -> float:
 
+    # Furthest vert from the middle, if the fill type is TRIFAN the extra vertex in the middle is simply the closest one
+    return float(np.linalg.norm(snap.co - snap.center, axis=1).max())
 
-def floats_are_same(c1: float, c2: float) -> bool:
-    """ Check if two floats are the same within a certain tolerance """
-    return float_distance(c1, c2) <= TOLERANCE
 
+def save_location_rotation(snap: MeshSnapshot, center: np.ndarray = None) -> tuple[Vector, Euler, Vector]:
+    """ Returns the true location and (possibly true) rotation of an object, at this point we can't be certain if the object is rotated, what matters is that we fix the location """
 
-def save_and_reset_transforms(ob: bpy.types.Object) -> tuple[Vector, Euler]:
-
-    saved_loc = Vector(ob.location)
-    saved_rot = Euler(ob.rotation_euler)
-    ob.location = (0, 0, 0)
-    ob.rotation_euler = (0, 0, 0)
-    bpy.ops.object.transform_apply(location=True, rotation=True, scale=True)
-
-    return saved_loc, saved_rot
-
-
-def fill_face(ob: bpy.types.Object) -> tuple[bool, int, int]:
-
-    difference = 0
-    count = len(ob.data.polygons)
-
-    # Select everything and add faces in case the object has no cap(nothing will happen if it already has them)
-    bpy.ops.mesh.select_all(action='SELECT')
-    bpy.ops.mesh.fill_holes(sides=0)
-    bpy.ops.mesh.select_all(action='DESELECT')
-
-    bpy.ops.object.editmode_toggle()
-    bpy.ops.object.editmode_toggle()
-
-    new_count = len(ob.data.polygons)
-    difference = new_count - count
+    # The true location is the median of the geometry, the same point ORIGIN_GEOMETRY would move the origin to
+    # Cones pass their own center since Blender puts their origin halfway between the base and the tip instead
+    if center is None:
+        center = snap.center
+    origin = Vector(snap.location)
 
-    # Did we fill a face?
-    return difference > 0, new_count, difference
+    return snap.to_world(center), Euler(snap.rotation_euler), origin
 
 
-def calculate_circle_radius(ob: bpy.types.Object) -> int:
+def solve_applied_rotation(ob: bpy.types.Object, use_selection: bool = False) -> np.ndarray:
+    """
+    Rotation the mesh was created with, in the space MeshSnapshot measures it in, apply_rotation_fix takes it from here
+    Primitives are solved from the mesh alone unless the user selected what to align to
+    Anything else aligns to the selection, or to its first face if nothing is selected
+    """
 
-    saved_loc, saved_rot = save_and_reset_transforms(ob)
+    snap = MeshSnapshot(ob)
+    mesh = ob.data
 
-    bm = bmesh.new()
-    bm.from_mesh(ob.data)
-    bm.verts.ensure_lookup_table()
+    verts = np.zeros(snap.vert_count, dtype=bool)
+    faces = np.zeros(snap.poly_count, dtype=bool)
+    if use_selection:
+        mesh.vertices.foreach_get('select', verts)
+        mesh.polygons.foreach_get('select', faces)
 
-    # Second because if the fill type is TRIFAN then there will be an extra vertex in the middle and it's at [0]th position
-    V = bm.verts[1].co
-    radius = vector_distance(Vector((0, 0, 0)), V)
+    primitive = primitive_type(ob)
+    if primitive and not verts.any():
+        return solve_rotation(snap, primitive)
 
-    # Return to original rotation rotation
-    bm.free()
-    ob.location = saved_loc
-    ob.rotation_euler = saved_rot
+    if not verts.any() and snap.poly_count:
+        faces[0] = True
+        verts[list(mesh.polygons[0].vertices)] = True
 
-    return radius
+    return solve_selection_rotation(snap, primitive, verts, faces)
 
 
-def calculate_polygon_radius(vertices: int, tip_vertex: Vector, neighbour_vertex: Vector) -> int:
+def keep_children(ob: bpy.types.Object, correction: Matrix) -> None:
     """
-    Look at https://drive.google.com/file/d/1azAUlG_XHxRG6XNy6xukxYQXmLwCqx1y/view?usp=sharing
+    Children follow the world matrix of their parent, correction is the inverse of how it's about to change(old = new @ correction)
+    Putting it in front of their parent inverse takes the change back out, so they stay where they are without evaluating anything
     """
+    for child in ob.children:
+        child.matrix_parent_inverse = correction @ child.matrix_parent_inverse
 
-    c = 2*pi/vertices
-    a = (pi-c)/2
-    B_angle_1 = pi/2-a
-    AB = vector_distance(tip_vertex, neighbour_vertex)
-    BD = AB*cos(B_angle_1)
-    B_angle_2 = pi/2-c
-    BC = BD/cos(B_angle_2)
-
-    return BC
 
-
-def find_tip_and_neighbour_vert(ob: bpy.types.Object) -> tuple[Vector, Vector]:
+def apply_rotation_fix(ob: bpy.types.Object, rotation: np.ndarray) -> None:
     """
-    Returns the furthest vertex from the middle and the one above it
-    Look at https://drive.google.com/file/d/1vxOz5l6AhCBY4ArNSKlRR037CkDBoPA8/view?usp=sharing
+    Rotates the mesh back flat on x/y axes and moves the rotation over to the object, so it looks exactly the same
+    Both happen around the origin so the origin doesn't move
     """
 
-    bm = bmesh.new()
-    bm.from_mesh(ob.data)
-    bm.verts.ensure_lookup_table()
-
-    # Blender always orders these in exactly the way we need, so we can just get first and second
-    tip_vert = bm.verts[0].co
-    neighbour_vert = bm.verts[1].co
-
-    return tip_vert, neighbour_vert
-
-
-def save_location_rotation(ob: bpy.types.Object) -> tuple[Vector, Euler, int]:
-    """ Returns the true location and (possibly true) rotation of an object, at this point we can't be certain if the object is rotated, what matters is that we fix the location """
-
-    # Save origin before changing it
-    origin = Vector(ob.matrix_world.translation)
-    bpy.ops.object.origin_set(type='ORIGIN_GEOMETRY', center='MEDIAN')
-
-    return Vector(ob.matrix_world.translation), Euler(ob.rotation_euler), origin
-
-
-def fix_cone_origin_and_save_location_rotation(ob: bpy.types.Object, applied_rotation: bool) -> tuple[Vector, Euler, int]:
-    """ Returns the true location and (possibly true) rotation of an object, at this point we can't be certain if the object is rotated, what matters is that we fix the location """
-
-    # If the rotation was applied then at this point object is upside down so we move it
-    shift_value = -ob.dimensions.z/4 if applied_rotation else ob.dimensions.z/4
-
-    # Save origin before changing it
-    origin = Vector(ob.matrix_world.translation)
-
-    # Fill in the missing faces so origin to center of volume would work for any type of cone
-    bpy.ops.object.editmode_toggle()
-    was_filled, total_faces, difference = fill_face(ob)
-    bpy.ops.object.editmode_toggle()
-
-    # Save the original location and rotation
-    bpy.ops.object.origin_set(type='ORIGIN_CENTER_OF_VOLUME', center='MEDIAN')
-    saved_rot = Euler(ob.rotation_euler)
-    saved_loc = Vector(ob.matrix_world.translation)
-
-    # Reset object location rotation then move the cursor where the cone origin should be and apply origin
-    cursor_loc = Vector(bpy.context.scene.cursor.location)
-    ob.rotation_euler = (0, 0, 0)
-    ob.location = (0, 0, 0)
-    bpy.context.scene.cursor.location = (0, 0, shift_value)
-    bpy.ops.object.origin_set(type='ORIGIN_CURSOR', center='MEDIAN')
-    bpy.context.scene.cursor.location = cursor_loc  # Restore cursor location
-
-    # if we filled in a face delete it
-    if was_filled:
-
-        bpy.ops.object.editmode_toggle()
-        bm = bmesh.from_edit_mesh(ob.data)
-
-        bpy.ops.mesh.select_all(action='DESELECT')
-        bm.faces.ensure_lookup_table()
-        bm.faces[total_faces-1].select_set(True)
+    # Linked duplicates share the mesh, rotating it would turn all of them, they keep the old one and this object gets its own copy
+    if ob.data.users > 1:
+        ob.data = ob.data.copy()
 
-        # if we added 2 faces select the other one aswell
-        if difference == 2:
-            bm.faces[total_faces-2].select_set(True)
-        bpy.ops.mesh.delete(type='FACE')
+    matrix = Matrix(rotation.tolist()).to_4x4()
+    ob.data.transform(matrix.transposed())
+    # The object turns by the rotation, children take the inverse of it(its transpose) so they don't turn with it
+    keep_children(ob, matrix.transposed())
+    ob.matrix_basis = ob.matrix_basis @ matrix
 
-        bpy.ops.object.editmode_toggle()
 
-    # Restore original object rotation and location, but because we moved the origin we have to move the object on local Z for the object to be at the same spot it was when its origin was broken
-    ob.location = saved_loc
-    ob.rotation_euler = saved_rot
-    bpy.ops.transform.translate(
-        value=(0, 0, shift_value), orient_type='LOCAL')
-
-    return Vector(ob.matrix_world.translation), saved_rot, origin
-
-
-def rotate_around_axis_followed_by_euler_rotation(axis: str, angle: float, euler_rotation: Euler) -> Euler:
+def analyze_torus(snap: MeshSnapshot) -> tuple[int, int, float, float, np.ndarray]:
     """
-    Used to calculate final rotation and done in 2 steps:
-        1. First rotating on given axis by given angle
-        2. Then rotating on all three axes
+    Returns major segments, minor segments, major radius, minor radius and the normal of the plane the major ring lies in
+    Every vertex is described by its height above the ring plane and its distance from the axis, verts that share both
+    are the same minor vertex repeated around the axis, so one np.unique over those pairs sorts the whole torus
     """
 
-    if axis == 'Z':
-        quat1 = Quaternion((0, 0, 1), angle)
-    elif axis == 'X':
-        quat1 = Quaternion((1, 0, 0), angle)
-    else:
-        quat1 = Quaternion((0, 1, 0), angle)
-
-    quat2 = euler_rotation.to_quaternion()
-    quat_outer_product = quat2 @ quat1
-
-    return quat_outer_product.to_euler()
-
-
-def calculate_torus_major_segments(ob: bpy.types.Object) -> int:
+    co = snap.co - snap.center
+    axis = find_symmetry_axis(snap.co)
+    step = max(float(np.linalg.norm(co, axis=1).max())*LEVEL_TOLERANCE, 1e-7)
 
-    saved_loc, saved_rot = save_and_reset_transforms(ob)
-
-    bm = bmesh.new()
-    bm.from_mesh(ob.data)
-    bm.verts.ensure_lookup_table()
-    middle = Vector((0, 0, 0))
-
-    # Get the distance of any vert to the center, then look for all the verts that belong to that ring
-    ring_vert = bm.verts[0].co
-    dist = vector_distance(ring_vert, middle)
+    heights = co @ axis
+    distances = np.linalg.norm(co - np.outer(heights, axis), axis=1)
 
     # Checking for same Z isn't enough because we can have an inner ring at same Z which shouldn't be counted, it has different dist though
     # Look at https://drive.google.com/file/d/12uINdegB93RPiPTYzLv5-8PSNVTv8J8S/view?usp=sharing
-    segments = sum([floats_are_same(v.co.z, ring_vert.z)
-                   and floats_are_same(vector_distance(v.co, middle), dist) for v in bm.verts])
-
-    # Restore original object location/rotation
-    bm.free()
-    ob.location = saved_loc
-    ob.rotation_euler = saved_rot
-
-    return segments
-
-
-def restore_origin(original_origin: Vector) -> None:
-    """Restores the origin by moving the 3D cursor to the original location and setting the origin to cursor"""
-    cursor_loc = Vector(bpy.context.scene.cursor.location)
-    bpy.context.scene.cursor.location = original_origin
-    bpy.ops.object.origin_set(type='ORIGIN_CURSOR', center='MEDIAN')
-    bpy.context.scene.cursor.location = cursor_loc
-
-
-def calculate_sphere_segments(ob):
+    _, counts = np.unique(bin_keys(np.column_stack((heights, distances)), step),
+                          return_counts=True)
 
-    # save both and reset to 0, return it to original after
-    saved_loc, saved_rot = save_and_reset_transforms(ob)
+    # Every ring has one vert per major segment, take the most common count in case float noise split a ring between two bins
+    major_segments = int(np.bincount(counts).argmax())
+    minor_segments = snap.vert_count//major_segments
 
-    bm = bmesh.new()
-    bm.from_mesh(ob.data)
+    # Minor rings are evenly spaced around the tube so their distances average out to the middle of the tube
+    major_radius = float(distances.mean())
+    minor_radius = float(np.hypot(distances - major_radius, heights).mean())
 
-    i = 0
+    return major_segments, minor_segments, major_radius, minor_radius, axis
 
-    # pick a vert that will never be top or bottom
-    bm.verts.ensure_lookup_table()
-    tempZ = round(bm.verts[4].co[2], 4)
 
-    # compare all the other vert Z values with the Z value we picked previously
-    # this gives us number of segments
-    for v in bm.verts:
-        current_vert = v.co
-        if round(current_vert[2], 4) == tempZ:
-            i += 1
-
-    bm.free()
-
-    # restore original object location/rotation
-    ob.location = saved_loc
-    ob.rotation_euler = saved_rot
+def analyze_uv_sphere(snap: MeshSnapshot) -> tuple[int, int, float]:
+    """
+    Returns segments, rings and radius of a UV sphere, read from how many edges every vertex has
+    Poles have one edge per segment, with 4 segments they look like any other vertex which also tells us the count
+    """
 
-    return i
+    poles = find_poles(snap)
+    segments = int(vertex_degrees(snap)[poles[0]]) if len(poles) else 4
 
+    # Every ring has one face per segment, including the triangles around the poles
+    rings = snap.poly_count//segments
+    radius = float(np.linalg.norm(snap.co - snap.center, axis=1).max())
 
-def calculate_icosphere_radius(ob):
+    return segments, rings, radius
 
-    # save both and reset to 0, return it to original after
-    saved_loc, saved_rot = save_and_reset_transforms(ob)
 
-    bm = bmesh.new()
-    bm.from_mesh(ob.data)
+def calculate_icosphere_radius(snap: MeshSnapshot) -> float:
+    return float(np.linalg.norm(snap.co[0] - snap.center))
 
-    bm.verts.ensure_lookup_table()
-    radius = vector_distance(bm.verts[0].co, Vector((0, 0, 0)))
 
-    ob.location = saved_loc
-    ob.rotation_euler = saved_rot
-    bm.free()
+def count_cap_faces(snap: MeshSnapshot) -> int:
+    """ Faces with normal pointing straight up or down, the object has to be sitting flat on x/y axes """
+    return int(np.count_nonzero(np.abs(snap.normals[:, 2]) > 0.99))
 
-    return radius
 
+def cap_type_from_faces(cap_faces: int) -> str:
+    if cap_faces == 0:
+        return 'NOTHING'
+    elif cap_faces <= 2:
+        return 'NGON'
+    return 'TRIFAN'
 
-def is_cone_cylindrical(ob: bpy.types.Object) -> bool:
-    ''' Cylindrical cones have the same location when origin is set to bounds or median '''
-    bpy.ops.object.origin_set(type='ORIGIN_GEOMETRY', center='BOUNDS')
-    loc_origin_bounds = Vector(ob.location)
-    bpy.ops.object.origin_set(type='ORIGIN_GEOMETRY', center='MEDIAN')
-    loc_origin_median = Vector(ob.location)
 
-    return vectors_are_same(loc_origin_bounds, loc_origin_median)
+def analyze_cone(snap: MeshSnapshot) -> tuple[float, float, int, str, float, np.ndarray, bool]:
+    """
+    Calculates bottom/top radius, number of verts, cap type, depth, center and if it's sharp tipped, all from the top and bottom rings
+    The rotation has to be fixed at this point so the rings are flat on x/y axes
+    """
 
+    z = snap.co[:, 2]
+    min_z, max_z = z.min(), z.max()
+    depth = float(max_z - min_z)
 
-def calculate_cone_properties(ob: bpy.types.Object) -> tuple[float, float, int, str, bool]:
-    """ Calculates bottom/top radius, number of verts,cap type and if it's sharp tipped"""
+    # Classify vertices as belonging to the top or bottom
+    top_vertices = snap.co[z >= max_z - TOLERANCE]
+    bottom_vertices = snap.co[z <= min_z + TOLERANCE]
 
-    # We already fixed the rotation at this point now just have to reset it to 0,0,0 so z values are correct
-    saved_rot = Euler(ob.rotation_euler)
-    ob.rotation_euler = (0, 0, 0)
-    bpy.ops.object.transform_apply(location=False, rotation=True, scale=False)
+    # A sharp tipped cone has a single vert on one end, the other end is its base
+    sharp_tipped = len(top_vertices) == 1 or len(bottom_vertices) == 1
+    base_vertices = top_vertices if len(bottom_vertices) == 1 else bottom_vertices
 
-    top_vertices, bottom_vertices = [], []
-    min_z, max_z = float('inf'), float('-inf')
+    # The middle of the base lies on the axis even if there is a trifan vert in it
+    # Blender puts the cone origin on the axis halfway between the base and the tip
+    x, y, _ = base_vertices.mean(axis=0)
+    center = np.array((x, y, (min_z + max_z)/2))
 
-    # Classify vertices as belonging to the top or bottom
-    for v in ob.data.vertices:
-        z = v.co.z
-        if z > max_z + TOLERANCE:
-            max_z = z
-            top_vertices = [v]
-        elif floats_are_same(z, max_z):
-            top_vertices.append(v)
-
-        if z < min_z - TOLERANCE:
-            min_z = z
-            bottom_vertices = [v]
-        elif floats_are_same(z, min_z):
-            bottom_vertices.append(v)
-
-    # Calculate radii
-    def calculate_radius_from_face_verts(vertices) -> int:
+    # Calculate radii, if the cap is a trifan the middle vert is the closest one so we only look at the furthest
+    def calculate_radius_from_face_verts(vertices: np.ndarray) -> float:
         if len(vertices) <= 1:
             return 0
-        center = sum((v.co for v in vertices), Vector()) / len(vertices)
-        return sum(vector_distance(v.co, center) for v in vertices) / len(vertices)
+        return float(np.linalg.norm(vertices[:, :2] - (x, y), axis=1).max())
 
     top_radius = calculate_radius_from_face_verts(top_vertices)
     bottom_radius = calculate_radius_from_face_verts(bottom_vertices)
 
-    sharp_tipped = len(top_vertices) == 1 or len(bottom_vertices) == 1
-
     # Determine cap type based on face normals and vertex count
-    cap_faces = [f for f in ob.data.polygons if abs(f.normal.z) > 0.99]
-    cap_type = 'NOTHING' if len(cap_faces) == 0 else (
-        'NGON' if len(cap_faces) <= 2 else 'TRIFAN')
+    cap_type = cap_type_from_faces(count_cap_faces(snap))
 
     # Vertices count for the larger end, subtract 1 if cap is trifan
     verts_count = max(len(top_vertices), len(bottom_vertices))
     verts_count = verts_count-1 if cap_type == 'TRIFAN' else verts_count
 
-    # Restore original object rotation
-    ob.rotation_euler = saved_rot
-
-    return bottom_radius, top_radius, verts_count, cap_type, sharp_tipped
+    return bottom_radius, top_radius, verts_count, cap_type, depth, center, sharp_tipped
 
 
-def calculate_cylinder_properties(ob: bpy.types.Object) -> tuple[float, int, str]:
+def calculate_cylinder_properties(snap: MeshSnapshot) -> tuple[float, int, str]:
     """ Calculates radius, number of verts and cap type"""
 
-    # Center the object and remember it's current location/rotation
-    saved_loc, saved_rot = save_and_reset_transforms(ob)
-
     # Get third vert because if cap was trifan, [0] and [1] are middle verts
-    cap_vert = ob.data.vertices[2].co
-    cap_verts = [v for v in ob.data.vertices
-                 if floats_are_same(v.co.z, cap_vert.z)]
+    co = snap.co - snap.center
+    cap_vert = co[2]
+    cap_verts = np.count_nonzero(np.abs(co[:, 2] - cap_vert[2]) <= TOLERANCE)
 
-    # Radius is the distance between a cap vert and a center fake vert(we centered the object so it's at 0,0,z)
-    radius = vector_distance(cap_vert, Vector((0, 0, cap_vert.z)))
+    # Radius is the distance between a cap vert and a center fake vert(we centered the coordinates so it's at 0,0,z)
+    radius = float(np.hypot(cap_vert[0], cap_vert[1]))
 
     # Get all the faces with normal pointing up or down, since the object is centered, the normal will be [0,0,1] or [0,0,-1]
-    cap_faces = [f for f in ob.data.polygons if abs(f.normal[2]) > 0.99]
-    if len(cap_faces) == 0:
-        cap_type = 'NOTHING'
-    elif len(cap_faces) <= 2:
-        cap_type = 'NGON'
-    else:
-        cap_type = 'TRIFAN'
+    cap_type = cap_type_from_faces(count_cap_faces(snap))
 
-    # Restore original object location/rotation
-    ob.location = saved_loc
-    ob.rotation_euler = saved_rot
+    verts = cap_verts-1 if cap_type == 'TRIFAN' else cap_verts
+    return radius, int(verts), cap_type
 
-    verts = len(cap_verts)-1 if cap_type == 'TRIFAN' else len(cap_verts)
-    return radius, verts, cap_type
 
+def count_unique_z(snap: MeshSnapshot) -> int:
+    return len(np.unique(np.round(snap.co[:, 2], 5)))
 
-def applied_rotation_circle(ob: bpy.types.Object) -> bool:
-    """ Checks if the circle verts have more than 1 unique Z value """
 
-    saved_rot = Euler(ob.rotation_euler)
-    bpy.ops.object.rotation_clear(clear_delta=False)
-    z = ob.data.vertices[0].co.z
-
-    applied = any(abs(z - v.co.z) > TOLERANCE for v in ob.data.vertices)
-
-    ob.rotation_euler = saved_rot
+def applied_rotation_circle(snap: MeshSnapshot) -> bool:
+    """ Checks if the circle verts have more than 1 unique Z value """
 
-    return applied
+    z = snap.co[:, 2]
+    return bool(np.any(np.abs(z - z[0]) > TOLERANCE))
 
 
-def applied_rotation_cone_or_cylinder(ob: bpy.types.Object) -> bool:
+def applied_rotation_cone_or_cylinder(snap: MeshSnapshot) -> bool:
     """ Check if cone or cylinder have verts with more than 2 unique Z values """
 
-    # Clear the rotation because we want the object sitting flat on x/y axes
-    saved_rot = Euler(ob.rotation_euler)
-    bpy.ops.object.rotation_clear(clear_delta=False)
-
-    zs = set()
-
-    for v in ob.data.vertices:
-
-        z = round(v.co.z, 5)
-        zs.add(z)
-
-        if len(zs) > 2:
-            return True
-
-    ob.rotation_euler = saved_rot
-    return False
+    return count_unique_z(snap) > 2
 
 
-def applied_rotation_torus(ob: bpy.types.Object) -> bool:
+def applied_rotation_torus(snap: MeshSnapshot) -> bool:
     """ Check if torus has more verts with different [Z] than minor segments """
 
-    # Clear the rotation because we want the object sitting flat on x/y axes
-    saved_rot = Euler(ob.rotation_euler)
-    bpy.ops.object.rotation_clear(clear_delta=False)
-    zs = set()
-
-    for v in ob.data.vertices:
-        z = round(v.co.z, 5)
-        zs.add(z)
-
-    ob.rotation_euler = saved_rot
-
     # total polygons = major segments*minor segments
     # At this point we don't know how many major or minor segments torus has but we know how many polygons
     # We also know that minimum number of both segments is 3, that means if we assume that there is 3 major segments then we get the max amount of minor segments
-    return len(zs) > len(ob.data.polygons)/3
+    return count_unique_z(snap) > snap.poly_count/3
 
 
-def applied_rotation_sphere(ob: bpy.types.Object) -> bool:
+def applied_rotation_sphere(snap: MeshSnapshot) -> bool:
     """ Check how many verts have different Z values, if the sphere is slightly rotated 
         it's gonna have more verts with different Zs than there are rings """
 
-    # Clear the rotation because we want the object sitting flat on x/y axes
-    saved_rot = Euler(ob.rotation_euler)
-    bpy.ops.object.rotation_clear(clear_delta=False)
-    zs = set()
-
-    for v in ob.data.vertices:
-
-        z = round(v.co.z, 5)
-        zs.add(z)
-
-    ob.rotation_euler = saved_rot
-
     # total polygons = segments*rings
     # At this point we don't know how many segments or rings sphere has, but we know how many polygons
     # We also know that the minimum number of both rings and segments is 3
     # By assuming the worst case scenario which is sphere having 3 segments we can say it has polygons/3 rings
-    return len(zs)-1 > len(ob.data.polygons)/3
-
-
-def select_smallest_from_selected_faces(faces) -> None:
-    bpy.ops.mesh.select_all(action='DESELECT')
-    faces[min([(f.calc_area(), idx)
-               for idx, f in enumerate(faces)])[1]].select_set(True)
-
-
-def show_or_hide_modifiers_in_viewport(ob, visibility) -> bool:
-    """ Modifiers change some object data so we disable them before calculating said data """
-
-    was_changed = False
-    for mod in getattr(ob, "modifiers", []):
-        # If modifier viewport visibility is different from given visibility
-        if mod.show_viewport != visibility:
-            mod.show_viewport = visibility
-            was_changed = True
-
-    return was_changed
-
-
-def calculate_z_offset(N: int) -> float:
-    """ Calculates the offset necessary to match the rotation after using fix rotation operator
-        it is equal to the interior angle between two sides divided by -2
-        look at https://drive.google.com/file/d/1FCij1TjPVtvxHkxPpxW_ekRujkDkQivQ/view?usp=sharing """
-
-    interior_angles = pi-(2*pi/N)
-    z_offset = -interior_angles/2
-
-    return z_offset
-
-
-def save_and_unparent_children(children: list[bpy.types.Object]) -> list[bpy.types.Object]:
-    """ Remove self as a parent from the children and keep their transforms """
-    for child in children:
-        matrix_world = child.matrix_world
-        child.parent = None
-        child.matrix_world = matrix_world
-
-    return children
-
-
-def reparent(child: bpy.types.Object, parent: bpy.types.Object) -> None:
-    """ Add self as a parent to the child again and keep its transforms """
-    child.parent = parent
-    child.matrix_parent_inverse = parent.matrix_world.inverted()
-
+    return count_unique_z(snap)-1 > snap.poly_count/3
 
-def copy_modifiers_and_delete_original(original_ob: bpy.types.Object, new_ob: bpy.types.Object) -> None:
 
-    parent = original_ob.parent
-    name = original_ob.name
+# Check that tells if the rotation of the primitive was applied, cones and cylinders share one, so do both spheres
+APPLIED_ROTATION = {
+    'CIRCLE': applied_rotation_circle,
+    'CONE': applied_rotation_cone_or_cylinder,
+    'CYLINDER': applied_rotation_cone_or_cylinder,
+    'TORUS': applied_rotation_torus,
+    'UV_SPHERE': applied_rotation_sphere,
+    'ICOSPHERE': applied_rotation_sphere,
+}
 
-    # Copy over display type and shading
-    new_ob.display_type = original_ob.display_type
-    if original_ob.data.use_auto_smooth:
-        bpy.ops.object.shade_smooth(
-            use_auto_smooth=True, auto_smooth_angle=original_ob.data.auto_smooth_angle)
-    else:  # Didn't have autosmooth but polygons are still smooth, use shade smooth without default variables
-        if original_ob.data.polygons and original_ob.data.polygons[0].use_smooth:
-            bpy.ops.object.shade_smooth()
 
-    # Remember all the collections the object belonged to since we will delete it
-    original_collections = original_ob.users_collection
-
-    if parent:
-        reparent(new_ob, original_ob.parent)
-
-        # If the parent has some modifiers that point to the original object, point them to new one instead
-        for mod in parent.modifiers:
-            if hasattr(mod, 'object') and mod.object == original_ob:
-                mod.object = new_ob
-
-    for child in original_ob.children:
-        reparent(child, new_ob)
-
-    # Make the original object active then copy all the modifiers and materials to the new object
-    bpy.context.view_layer.objects.active = original_ob
-    bpy.ops.object.make_links_data(type='MODIFIERS')
-    bpy.ops.object.make_links_data(type='MATERIAL')
-
-    # Delete the original object mesh, this will also delete the object
-    bpy.data.meshes.remove(bpy.data.meshes[original_ob.data.name])
-
-    # Select the newly created object
-    new_ob.select_set(True)
-    bpy.context.view_layer.objects.active = new_ob
-
-    # Rename the new object to match the original, and add it to all the collections the original object belonged to
-    new_ob.name = name
-    for col in original_collections:
-        if name not in col.objects:
-            col.objects.link(new_ob)
-
-    # Also remove it from the default collection if it wasn't there to begin with(when we add new objects they go to default collection)
-    default_collection = bpy.context.scene.collection
-    if new_ob.name in default_collection and default_collection not in original_collections:
-        default_collection.objects.unlink(new_ob)
-
-
-def select_unique_faces(ob: bpy.types.Object) -> None:
-    """ Select faces that appear only once or twice, otherwise select the first one """
-    bm = bmesh.from_edit_mesh(ob.data)
-    area_faces = defaultdict(list)
-
-    # Group faces by their area
-    for face in bm.faces:
-        area = round(face.calc_area(), 4)
-        area_faces[area].append(face)
-
-    # Get unique faces (appear only once or twice)
-    unique_faces = chain.from_iterable(
-        faces for faces in area_faces.values() if len(faces) <= 2)
-
-    # Deselect everything and select unique faces
-    bpy.ops.mesh.select_all(action='DESELECT')
-    if len(unique_faces) > 0:
-        for face in unique_faces:
-            face.select_set = True
-    else:
-        bm.faces[0].select_set(True)
-
-
-def select_rotational_cylinder(ob: bpy.types.Object):
+def infer_parameters(ob: bpy.types.Object, primitive: str) -> tuple[dict, Vector, Euler, Vector, bool]:
     """
-    Select or create faces that are needed to properly rotate the cylinder
-    #TODO Refactor
+    Reads everything a primitive was created with from its mesh, parameters use the same names as the properties of the tweak operators
+    Returns the parameters, true location and rotation, the origin and if the rotation was applied
     """
 
-    # change selection to faces
-    bpy.context.tool_settings.mesh_select_mode = (False, False, True)
-
-    was_filled, total_faces, difference = fill_face(ob)
-    bm = bmesh.from_edit_mesh(ob.data)
-
-    # try to select ngons
-    bpy.ops.mesh.select_face_by_sides(number=4, type='GREATER')
-
-    # ngon cap-------------------------------------------------------------------------------------------------------------------
-    if len([f for f in bm.faces if f.select]) != 0:
-
-        # deselect 1 and align view to selection
-        bpy.ops.mesh.select_nth(skip=1, nth=1)
-        bpy.ops.view3d.view_axis(type='TOP', align_active=True)
-
-    # cylinder is a rectangle
-    elif len(bm.faces) == 6:
-
-        # select top/bottom face and align to selection
-        bm.faces.ensure_lookup_table()
-        bm.faces[5].select_set(True)
-        bpy.ops.view3d.view_axis(type='TOP', align_active=True)
-
-    elif len(bm.faces) == 5:
-
-        # select top/bottom face and align to selection
-        bm.faces.ensure_lookup_table()
-        bm.faces[4].select_set(True)
-        bpy.ops.view3d.view_axis(type='TOP', align_active=True)
-
-    # cap is made of triangles------------------------------------------------------------
-    else:
-
-        # this selects one of the faces on top/bottom, we get the full face using coplanar
-        bm.faces.ensure_lookup_table()
-        bm.faces[total_faces-2].select_set(True)
-        bpy.ops.mesh.select_similar(type='FACE_COPLANAR', threshold=0.01)
-
-        # dissolve selected faces,left with an ngon
-        bpy.ops.mesh.dissolve_faces()
-
-        # align view to selection and poke faces back
-        bpy.ops.view3d.view_axis(type='TOP', align_active=True)
-        bpy.ops.mesh.poke()
-
-    # delete cap if we added it
-    if was_filled:
+    # The last inference is stored on the mesh, if the verts didn't change since then neither did the answer
+    with stats.stage('cache'):
+        digest = cache.geometry_hash(ob)
+        cached = cache.load(ob, primitive, digest)
+    if cached is not None:
+        return cached
+
+    # Read the mesh once, every calculation below works on this snapshot
+    with stats.stage('snapshot'):
+        snap = MeshSnapshot(ob)
+
+    # If the rotation was applied we find out what it truly is and look at the mesh as if it wasn't
+    with stats.stage('rotation'):
+        applied_rotation = APPLIED_ROTATION[primitive](snap)
+        true_rotation = solve_rotation(snap, primitive) if applied_rotation else np.identity(3)
+        if applied_rotation:
+            snap.reorient(true_rotation)
+
+    with stats.stage('inference'):
+        center = None
+        if primitive == 'CIRCLE':
+            cap_fill = 'NOTHING' if snap.poly_count == 0 else 'NGON' if snap.poly_count == 1 else 'TRIFAN'
+            vertices = snap.vert_count-1 if cap_fill == 'TRIFAN' else snap.vert_count
+            parameters = dict(vertices=vertices, radius=calculate_circle_radius(snap), cap_fill=cap_fill)
+
+        # Sadly origin to geometry doesn't work for cones, their origin is halfway between the base and the tip
+        elif primitive == 'CONE':
+            radius1, radius2, vertices, cap_fill, depth, center, _ = analyze_cone(snap)
+            parameters = dict(vertices=vertices, radius1=radius1, radius2=radius2, depth=depth, cap_fill=cap_fill)
+
+        elif primitive == 'CYLINDER':
+            radius, vertices, cap_fill = calculate_cylinder_properties(snap)
+            parameters = dict(vertices=vertices, radius=radius, depth=float(snap.dimensions[2]), cap_fill=cap_fill)
+
+        elif primitive == 'ICOSPHERE':
+            parameters = dict(subdivisions=int(log(snap.poly_count/20, 4)+1), radius=calculate_icosphere_radius(snap))
+
+        elif primitive == 'TORUS':
+            major_segments, minor_segments, major_radius, minor_radius, _ = analyze_torus(snap)
+            parameters = dict(major_segments=major_segments, minor_segments=minor_segments,
+                              major_radius=major_radius, minor_radius=minor_radius)
 
-        # select last 2 added faces and delete them
-        bm.faces.ensure_lookup_table()
-        bm.faces[total_faces-1].select_set(True)
-        bm.faces[total_faces-2].select_set(True)
-        bpy.ops.mesh.delete(type='FACE')
-
-
-def select_rotational_cone(ob: bpy.types.Object):
-    """ Select or create faces that are needed to properly rotate the cone """
-
-    # Change selection to faces
-    bpy.context.tool_settings.mesh_select_mode = (False, False, True)
-
-    was_filled, total_faces, difference = fill_face(ob)
-    bm = bmesh.from_edit_mesh(ob.data)
-
-    # try to select ngons
-    bpy.ops.mesh.select_face_by_sides(number=4, type='GREATER')
-    selected_faces = [f for f in bm.faces if f.select]
-    selected = len(selected_faces)
-
-    # single ngon cap-------------------------------------------------------------------------------------------------------------------
-    if selected == 1:
-
-        # align view to selection
-        bpy.ops.view3d.view_axis(type='TOP', align_active=True)
-
-    # double ngon cap-------------------------------------------------------------------------------------------------------------------
-    elif selected == 2:
-
-        select_smallest_from_selected_faces(selected_faces)
-
-        # align view to selection
-        bpy.ops.view3d.view_axis(type='TOP', align_active=True)
-
-    # if nothing got selected try to select quads
-    else:
-
-        bpy.ops.mesh.select_face_by_sides(number=4, type='EQUAL')
-        selected_faces = [f for f in bm.faces if f.select]
-        selected = len(selected_faces)
-        # quad cap----------------------------
-        if selected == 1:
-
-            # align view to selection
-            bpy.ops.view3d.view_axis(type='TOP', align_active=True)
-
-        # double quad cap-----------------------------
-        elif selected == 2:
-
-            # first select the pair that only appears once(top and bottom, not sides)
-            select_unique_faces(ob)
-            # then select the smaller one
-            selected_faces = [f for f in bm.faces if f.select]
-            select_smallest_from_selected_faces(selected_faces)
-
-            # align view to selection
-            bpy.ops.view3d.view_axis(type='TOP', align_active=True)
-
-        # edge case when cone is made of six quads, both top and bottom base, and sides are all quads
-        elif selected == 6:
-
-            # first select the pair that only appears once(top and bottom, not sides)
-            select_unique_faces(ob)
-            # then select the smaller one
-            selected_faces = [f for f in bm.faces if f.select]
-            select_smallest_from_selected_faces(selected_faces)
-
-            # align view to selection
-            bpy.ops.view3d.view_axis(type='TOP', align_active=True)
-
-        # cap is made of triangles------------------------------------------------------------------------------------------------------------
         else:
+            segments, rings, radius = analyze_uv_sphere(snap)
+            parameters = dict(segments=segments, rings=rings, radius=radius)
 
-            # selection to verts
-            bpy.context.tool_settings.mesh_select_mode = (True, False, False)
-
-            # special case when cone is a pyramid but cap isn't trifan
-            if len(ob.data.vertices) == 4:
-
-                # this will select the base and align to it, if all faces are same then it doesn't matter
-                select_unique_faces(ob)
-                bpy.ops.view3d.view_axis(type='TOP', align_active=True)
-
-                # delete cap if we added it
-                if was_filled:
-                    bpy.ops.mesh.delete(type='FACE')
-
-                return
-
-            # special case when cone is a half pyramid but cap isn't trifan
-            if len(ob.data.vertices) == 6:
-
-                # this will select the top and botom base
-                select_unique_faces(ob)
-
-                # select the smaller of the two and align to it
-                selected_faces = [f for f in bm.faces if f.select]
-                select_smallest_from_selected_faces(selected_faces)
-                bpy.ops.view3d.view_axis(type='TOP', align_active=True)
-
-                # delete cap if we added it
-                if was_filled:
-
-                    bm.faces.ensure_lookup_table()
-                    bm.faces[total_faces-1].select_set(True)
-                    # if we added 2 faces delete it aswell
-                    if difference == 2:
-                        bm.faces[total_faces-2].select_set(True)
-                    bpy.ops.mesh.delete(type='FACE')
-
-                return
+        parameters['b_UV'] = bool(ob.data.uv_layers)
 
-            # this will select everything but the cap vert, invert to get it
-            bpy.ops.mesh.edges_select_sharp(sharpness=0.0174533)
-            bpy.ops.mesh.select_all(action='INVERT')
-            selected_faces = [v for v in bm.verts if v.select]
-            selected = len(selected_faces)
+    with stats.stage('location'):
+        if center is None:
+            center = snap.center
+        location, rotation, origin = save_location_rotation(snap, center)
 
-            # cone has 1 side
-            if selected == 1:
+    with stats.stage('cache'):
+        cache.store(ob, primitive, digest, parameters, true_rotation, center, applied_rotation)
 
-                # select all the faces touching the cap vert, this selects the entire base
-                bpy.ops.mesh.select_more(use_face_step=True)
-                bpy.ops.mesh.dissolve_faces()
-                bpy.ops.view3d.view_axis(type='TOP', align_active=True)
-                bpy.ops.mesh.poke()
+    return parameters, location, rotation, origin, applied_rotation
 
-                return
 
-            # cone has two sides we have to dissolve the middle verts and select the smaller face
-            else:
+def aligned_rotation(align: str, rotation: Euler) -> Euler:
+    """ Rotation the new primitive gets, same choices as the align option of the primitive operators """
 
-                # change select mode to faces and select all the triangles
-                bpy.context.tool_settings.mesh_select_mode = (
-                    False, False, True)
-                bpy.ops.mesh.select_face_by_sides(number=3, type='EQUAL')
+    if align == 'VIEW':
+        space = bpy.context.space_data
+        if space and space.type == 'VIEW_3D':
+            return space.region_3d.view_rotation.to_euler()
+    elif align == 'CURSOR':
+        return bpy.context.scene.cursor.rotation_euler.copy()
 
-                # dissolve faces, we'll end up with 1 face on each side
-                bpy.ops.mesh.dissolve_faces()
+    return rotation
 
-                selected_faces = [f for f in bm.faces if f.select]
-                select_smallest_from_selected_faces(selected_faces)
 
-                # align view to selection
-                bpy.ops.view3d.view_axis(type='TOP', align_active=True)
-
-                # we deselected one of them previously, reselect it and poke both faces
-                selected_faces[0].select_set(True)
-                selected_faces[1].select_set(True)
-                bpy.ops.mesh.poke()
-
-    # if we filled in a face delete it
-    if was_filled:
-
-        bpy.ops.mesh.select_all(action='DESELECT')
-        bm.faces.ensure_lookup_table()
-        bm.faces[total_faces-1].select_set(True)
-
-        # if we added 2 faces select the other one aswell
-        if difference == 2:
-            bm.faces[total_faces-2].select_set(True)
-        bpy.ops.mesh.delete(type='FACE')
-
-
-def insert_middle_face_torus(ob):
+def rebuild(ob: bpy.types.Object, topology: str, build, b_UV: bool, location: Vector, rotation: Euler, align: str, origin: Vector) -> None:
     """
-    select the middle torus ring and fill in a face, we need this to properly rotate
+    Writes the built primitive into the mesh of the object and puts the object where the primitive should be, with scale 1
+    The object and its mesh stay the same datablocks so modifiers, constraints, drivers, parenting, collections and materials stay untouched
+    build takes calc_uvs and returns the geometry, topology describes everything that changes faces or UVs
     """
 
-    bm = bmesh.from_edit_mesh(ob.data)
-    i = 0
-    # select two different verts in the same ring by comparing their distances to middle
-    for v in bm.verts:
-
-        current_vert = v.co
-        # if first time in the loop initialize distance from the current point to the middle
-        if i == 0:
-            shared_distance = round(vector_distance(
-                current_vert, Vector((0, 0, 0))), 4)
-            v.select = True
-            i += 1
-            continue
-
-        if round(vector_distance(current_vert, Vector((0, 0, 0))), 4) == shared_distance:
-            # select the other vert if it has same distance
-            v.select = True
-            # break as soon as we get second one we can select the entire ring by knowing just the 2 of them
-            break
-
-    # confirm selection
-    bpy.ops.object.editmode_toggle()
-    bpy.ops.object.editmode_toggle()
+    # Linked duplicates share the mesh, they keep the old one and this object gets its own copy
+    if ob.data.users > 1:
+        ob.data = ob.data.copy()
+    mesh = ob.data
+
+    # Primitives are built around their location, shifting the verts keeps the origin where it was
+    # We know the matrix we're about to set so there's no need to evaluate the view layer for it
+    matrix = Matrix.LocRotScale(location, aligned_rotation(align, rotation), None)
+    offset = np.array(matrix.inverted() @ origin)
+
+    # Only the dimensions changed since we last built this mesh, faces, UVs and attributes stay and we only move the verts
+    # The key is stored on the mesh so undo restores it together with the geometry it belongs to
+    geometry = None
+    if mesh.get(TOPOLOGY_KEY) == topology:
+        with stats.stage('build'):
+            geometry = build(False)
+        co, loops, starts, _, _ = geometry
+        if (len(co), len(loops), len(starts)) == (len(mesh.vertices), len(mesh.loops), len(mesh.polygons)):
+            with stats.stage('write'):
+                write_positions(mesh, co - offset)
+        else:
+            geometry = None
+
+    if geometry is None:
+        with stats.stage('build'):
+            co, *topology_arrays = build(b_UV)
+        with stats.stage('write'):
+            smooth = mesh.use_auto_smooth or bool(mesh.polygons and mesh.polygons[0].use_smooth)
+            write_geometry(mesh, (co - offset, *topology_arrays), smooth)
+            mesh[TOPOLOGY_KEY] = topology
+
+    with stats.stage('placement'):
+        matrix.translation = origin
+        keep_children(ob, matrix.inverted() @ ob.matrix_world)
+        ob.matrix_world = matrix
+
+
+def topology_key(*parameters) -> str:
+    """ Joins the parameters that decide faces and UVs of a primitive into a string we can store on the mesh """
+    return " ".join(str(parameter) for parameter in parameters)
+
+
+def replace_primitive(ob: bpy.types.Object, primitive: str, parameters: dict, location: Vector, rotation: Euler, align: str,
+                      origin: Vector) -> None:
+    """ Replaces the mesh of given object with a primitive, parameters use the same names as the properties of the tweak operators """
+
+    p = parameters
+    if primitive == 'CIRCLE':
+        topology = topology_key(primitive, p['vertices'], p['cap_fill'], p['b_UV'])
+        def build(calc_uvs):
+            return build_circle(p['vertices'], p['radius'], p['cap_fill'], calc_uvs)
+
+    # An end with a radius of 0 merges into a single vert
+    elif primitive == 'CONE':
+        topology = topology_key(primitive, p['vertices'], p['cap_fill'], p['b_UV'], p['radius1'] == 0, p['radius2'] == 0)
+        def build(calc_uvs):
+            return build_cone(p['vertices'], p['radius1'], p['radius2'], p['depth'], p['cap_fill'], calc_uvs)
+
+    elif primitive == 'CYLINDER':
+        topology = topology_key(primitive, p['vertices'], p['cap_fill'], p['b_UV'], p['radius'] == 0)
+        def build(calc_uvs):
+            return build_cylinder(p['vertices'], p['radius'], p['depth'], p['cap_fill'], calc_uvs)
+
+    elif primitive == 'ICOSPHERE':
+        topology = topology_key(primitive, p['subdivisions'], p['b_UV'])
+        def build(calc_uvs):
+            return build_icosphere(p['subdivisions'], p['radius'], calc_uvs)
+
+    elif primitive == 'TORUS':
+        topology = topology_key(primitive, p['major_segments'], p['minor_segments'], p['b_UV'])
+        def build(calc_uvs):
+            return build_torus(p['major_segments'], p['minor_segments'], p['major_radius'], p['minor_radius'], calc_uvs)
 
-    # now that we have 2 verts on same ring selected we just have to use select ring command
-    bpy.ops.mesh.loop_multi_select(ring=False)
+    else:
+        topology = topology_key(primitive, p['segments'], p['rings'], p['b_UV'])
+        def build(calc_uvs):
+            return build_uv_sphere(p['segments'], p['rings'], p['radius'], calc_uvs)
 
-    # after that we'll fill in a face and change selection to faces
-    bpy.ops.mesh.edge_face_add()
-    bpy.context.tool_settings.mesh_select_mode = (False, False, True)
+    rebuild(ob, topology, build, p['b_UV'], location, rotation, align, origin)
 
-    # align to selected face and delete it, we don't need it anymore, discard it like others discard us
-    bpy.ops.view3d.view_axis(type='TOP', align_active=True)
-    bpy.ops.mesh.delete(type='FACE')
+    # We know exactly what we just built, the next invoke reads it back instead of inferring it from the verts
+    # The new mesh is unrotated and the true location is where the object space puts the primitive's center
+    with stats.stage('stamp'):
+        center = np.array(ob.matrix_world.inverted() @ location)
+        cache.store(ob, primitive, cache.geometry_hash(ob), parameters, np.identity(3), center, False, rebuilt=True)
 
-    return
 
 # Individual functions that replace the current mesh with a new one that looks the same-----------------------------------------------------------------
 
-
 def replace_circle(vertices, radius, cap_fill, location, rotation, align, b_UV: bool, origin: Vector) -> None:
-
-    # original object reference
-    original_ob = bpy.context.active_object
-
-    if align != "WORLD":
-        bpy.ops.mesh.primitive_circle_add(vertices=vertices, radius=radius, fill_type=cap_fill, location=location, calc_uvs=b_UV,
-                                          align=align)
-    else:
-        bpy.ops.mesh.primitive_circle_add(vertices=vertices, radius=radius, fill_type=cap_fill, location=location, rotation=rotation,
-                                          calc_uvs=b_UV)
-
-    new_ob = bpy.context.active_object
-    copy_modifiers_and_delete_original(original_ob, new_ob)
-    restore_origin(origin)
+    replace_primitive(bpy.context.active_object, 'CIRCLE', dict(vertices=vertices, radius=radius, cap_fill=cap_fill, b_UV=b_UV),
+                      location, rotation, align, origin)
 
 
 def replace_cone(vertices, radius1, radius2, depth, cap_fill, location, rotation, align, b_UV, origin: Vector) -> None:
-
-    # original object reference
-    original_ob = bpy.context.active_object
-
-    # add a new object that matches the original object
-    if align != "WORLD":
-
-        bpy.ops.mesh.primitive_cone_add(end_fill_type=cap_fill, depth=depth, radius1=radius1, radius2=radius2, vertices=vertices,
-                                        location=location, calc_uvs=b_UV, align=align)
-    else:
-        bpy.ops.mesh.primitive_cone_add(end_fill_type=cap_fill, depth=depth, radius1=radius1, radius2=radius2, vertices=vertices,
-                                        location=location, calc_uvs=b_UV, rotation=rotation)
-
-    new_ob = bpy.context.active_object
-    copy_modifiers_and_delete_original(original_ob, new_ob)
-    restore_origin(origin)
+    replace_primitive(bpy.context.active_object, 'CONE', dict(vertices=vertices, radius1=radius1, radius2=radius2, depth=depth,
+                                                              cap_fill=cap_fill, b_UV=b_UV), location, rotation, align, origin)
 
 
 def replace_cylinder(vertices, radius, depth, cap_fill, location, rotation, align, b_UV, origin: Vector) -> None:
-    # original object reference
-    original_ob = bpy.context.active_object
-
-    if align != "WORLD":
-        bpy.ops.mesh.primitive_cylinder_add(end_fill_type=cap_fill, depth=depth, radius=radius, vertices=vertices, location=location,
-                                            calc_uvs=b_UV, align=align)
-    else:
-        bpy.ops.mesh.primitive_cylinder_add(
-            end_fill_type=cap_fill, depth=depth, radius=radius, vertices=vertices, location=location, rotation=rotation, calc_uvs=b_UV)
-
-    new_ob = bpy.context.active_object
-    copy_modifiers_and_delete_original(original_ob, new_ob)
-    restore_origin(origin)
+    replace_primitive(bpy.context.active_object, 'CYLINDER', dict(vertices=vertices, radius=radius, depth=depth, cap_fill=cap_fill,
+                                                                  b_UV=b_UV), location, rotation, align, origin)
 
 
 def replace_icosphere(subdivisions, radius, location, rotation, align, b_UV, origin: Vector) -> None:
-
-    # original object reference
-    original_ob = bpy.context.active_object
-
-    if align != "WORLD":
-        bpy.ops.mesh.primitive_ico_sphere_add(
-            subdivisions=subdivisions, radius=radius, location=location, calc_uvs=b_UV, align=align)
-    else:
-        bpy.ops.mesh.primitive_ico_sphere_add(subdivisions=subdivisions, radius=radius, location=location, rotation=rotation,
-                                              calc_uvs=b_UV)
-
-    new_ob = bpy.context.active_object
-    copy_modifiers_and_delete_original(original_ob, new_ob)
-    restore_origin(origin)
+    replace_primitive(bpy.context.active_object, 'ICOSPHERE', dict(subdivisions=subdivisions, radius=radius, b_UV=b_UV),
+                      location, rotation, align, origin)
 
 
 def replace_torus(major_segments, minor_segments, major_radius, minor_radius, location, rotation, align, b_UV, origin: Vector) -> None:
-
-    # original object reference
-    original_ob = bpy.context.active_object
-
-    if align != "WORLD":
-        bpy.ops.mesh.primitive_torus_add(major_segments=major_segments, minor_segments=minor_segments, location=location,
-                                         major_radius=major_radius, minor_radius=minor_radius, generate_uvs=b_UV, align=align)
-    else:
-        bpy.ops.mesh.primitive_torus_add(major_segments=major_segments, minor_segments=minor_segments, location=location,
-                                         major_radius=major_radius, minor_radius=minor_radius, generate_uvs=b_UV, rotation=rotation)
-
-    new_ob = bpy.context.active_object
-    copy_modifiers_and_delete_original(original_ob, new_ob)
-    restore_origin(origin)
+    replace_primitive(bpy.context.active_object, 'TORUS', dict(major_segments=major_segments, minor_segments=minor_segments,
+                                                               major_radius=major_radius, minor_radius=minor_radius, b_UV=b_UV),
+                      location, rotation, align, origin)
 
 
 def replace_uv_sphere(segments, rings, radius, location, rotation, align, b_UV, origin: Vector) -> None:
-
-    # original object reference
-    original_ob = bpy.context.active_object
-
-    if align != "WORLD":
-        bpy.ops.mesh.primitive_uv_sphere_add(segments=segments, ring_count=rings, radius=radius, location=location, calc_uvs=b_UV,
-                                             align=align)
-    else:
-        bpy.ops.mesh.primitive_uv_sphere_add(segments=segments, ring_count=rings, radius=radius, location=location, rotation=rotation,
-                                             calc_uvs=b_UV)
-
-    new_ob = bpy.context.active_object
-    copy_modifiers_and_delete_original(original_ob, new_ob)
-    restore_origin(origin)
-
-
-def calculate_sides(ob):
-
-    total_faces = len(ob.data.polygons)
-    total_vertices = len(ob.data.vertices)
-    sides = 0
-    group = 0
-
-    if ob.data.name.startswith(localization_cylinder):
-        group = 1
-        if total_faces == (total_vertices/2)+2 or total_faces == total_vertices/2:
-            sides = total_vertices/2
-        else:
-            sides = total_vertices-2/2
-
-    elif ob.data.name.startswith(localization_circle):
-        group = 1
-        if total_faces == 0:
-            cap_type = 'NOTHING'
-        elif total_faces == 1:
-            cap_type = 'NGON'
-        else:
-            cap_type = 'TRIFAN'
-        if cap_type == 'TRIFAN':
-            sides = total_vertices-1
-        else:
-            sides = total_vertices
-
-    elif ob.data.name.startswith(localization_cone):
-        group = 1
-
-        # first rotate it by 180 on Y axis because it will be flipped
-        ob.rotation_euler = Euler((0, pi, 0))
-        bpy.ops.object.transform_apply(
-            location=False, rotation=True, scale=False)
-
-        _, _, sides, _, _ = calculate_cone_properties(ob)
-
-    elif ob.data.name.startswith(localization_sphere):
-        group = 1
-        sides = calculate_sphere_segments(ob)
-
-    elif ob.data.name.startswith(localization_torus):
-        group = 2
-        sides = calculate_torus_major_segments(ob)
-
-    elif ob.data.name.startswith(localization_icosphere):
-        group = 3
-
-    return sides, group
-
-
-def Z_offset_ob(ob: bpy.types.Object) -> None:
-    """ After fixing object rotation we might have to rotate it around Z axis to match the original """
-    # We have to know how many sides object has and which group it belongs to
-    sides, group = calculate_sides(ob)
-
-    # Circle, cone, UVSphere and cylinder
-    if group == 1:
-        if (sides-2) % 4:
-            if ob.data.name.startswith(localization_cone) and sides % 2:
-                ob.rotation_euler = Euler((0, 0, pi/2))
-            else:
-                ob.rotation_euler = Euler((0, 0, -calculate_z_offset(sides)))
-
-    # Torus
-    elif group == 2:
-
-        # If you were to cut torus on both X and Y and the quarter piece you get was symmetrical to itself
-        if sides % 4 == 0:
-            z_offset = calculate_z_offset(sides)
-            ob.rotation_euler = Euler((0, 0, -z_offset))
-
-        # Torus is symmetrical on both X and Y but the quarter piece isn't symmetrical
-        elif sides % 2 == 0:
-            ob.rotation_euler = Euler((0, 0, -pi/2))
-
-        # Torus is only symmetrical on 1 axis
-        else:
-            ob.rotation_euler = Euler((0, 0, -pi))
-
-    # Unlike other objects icosphere only needs to be rotated on Z for 180
-    elif group == 3:
-        ob.rotation_euler = Euler((0, 0, -pi))
-
-    # No need to fix the rotation for other types
-    return
-
-
-def smart_selection(ob: bpy.types.Object) -> None:
-    """ Selects the necessary face in order to rotate the object properly """
-
-    if ob.data.name.startswith(localization_sphere):
-
-        # Select all quads invert the selection,we get the top and bottom vert
-        bpy.ops.mesh.select_face_by_sides(number=4, type='EQUAL')
-        bpy.ops.mesh.select_all(action='INVERT')
-
-        # deselect one and select all the surrounding faces
-        bpy.ops.mesh.select_nth(skip=1, nth=1, offset=0)
-        bpy.ops.mesh.select_more(use_face_step=True)
-
-        # make a duplicate of selected faces and even them out
-        bpy.ops.mesh.duplicate()
-        bpy.ops.transform.resize(value=(1, 1, 0), orient_type='NORMAL')
-
-        # dissolve faces to get an ngon, align to newly made NGON and then delete it
-        bpy.ops.mesh.dissolve_faces()
-        bpy.ops.view3d.view_axis(type='TOP', align_active=True)
-        bpy.ops.mesh.delete(type='FACE')
-
-    elif ob.data.name.startswith(localization_cylinder):
-        select_rotational_cylinder(ob)
-
-    elif ob.data.name.startswith(localization_torus):
-        insert_middle_face_torus(ob)
-
-    elif ob.data.name.startswith(localization_circle):
-        faces = len(ob.data.polygons)
-        circleHadNoCap = False
-
-        # change selection to faces and select everything
-        bpy.context.tool_settings.mesh_select_mode = (False, False, True)
-        bpy.ops.mesh.select_all(action='SELECT')
-
-        # if circle doesn't have a cap fill it
-        if faces == 0:
-
-            circleHadNoCap = True
-            bpy.ops.mesh.fill_holes(sides=0)
-
-        # trifan cap --------------------------------------------------------------------------
-        if faces > 1:
-
-            bpy.ops.mesh.dissolve_faces()
-            bpy.ops.view3d.view_axis(type='TOP', align_active=True)
-            bpy.ops.mesh.poke()
-
-            return
-
-        # align to selection
-        bpy.ops.view3d.view_axis(type='TOP', align_active=True)
-
-        # delete cap if we added it
-        if circleHadNoCap:
-
-            bpy.ops.mesh.delete(type='ONLY_FACE')
-
-    elif ob.data.name.startswith(localization_cone):
-
-        select_rotational_cone(ob)
-
-    elif ob.data.name.startswith(localization_icosphere):
-
-        # select the top vert and surrounding faces
-        bm = bmesh.from_edit_mesh(ob.data)
-        bm.verts.ensure_lookup_table()
-        bm.verts[0].select_set(True)
-        bpy.ops.mesh.select_more(use_face_step=True)
-
-        # make a duplicate of selected faces and even them out
-        bpy.ops.mesh.duplicate()
-        bpy.ops.transform.resize(value=(1, 1, 0), orient_type='NORMAL')
-
-        # dissolve faces to get an ngon, align to newly made NGON and then delete it
-        bpy.ops.mesh.dissolve_faces()
-        bpy.ops.view3d.view_axis(type='TOP', align_active=True)
-        bpy.ops.mesh.delete(type='FACE')
-
-    # else the object is none of the primitive shapes
-    else:
-
-        # change selection to faces
-        bpy.context.tool_settings.mesh_select_mode = (False, False, True)
-
-        # select first face and align view to selection
-        bm = bmesh.from_edit_mesh(ob.data)
-        bm.faces.ensure_lookup_table()
-        bm.faces[0].select_set(True)
-
-        # align view to selection
-        bpy.ops.view3d.view_axis(type='TOP', align_active=True)
-
-    return
+    replace_primitive(bpy.context.active_object, 'UV_SPHERE', dict(segments=segments, rings=rings, radius=radius, b_UV=b_UV),
+                      location, rotation, align, origin)
@@ -1,12 +1,72 @@
 import bpy
 from .localization import *
 from .core import *
-from math import log, pi
+from . import stats
+from time import perf_counter
 from bpy.types import Operator
 from bpy.props import BoolProperty, IntProperty, EnumProperty, FloatProperty
 from mathutils import Vector, Euler
 
-CUBE_NAME = "cube_to_delete_123#"
+# Shortest time between two previews, callbacks that come in faster wait for a timer
+PREVIEW_FRAME_TIME = 1/30
+
+
+class LivePreview:
+    """
+    Shows changes from the window popup live, shared by the tweak operators
+    check() gets called for every property callback, we skip the ones that don't change anything
+    and callbacks that come in faster than a frame wait for a timer that only builds the latest values
+    """
+
+    # parameters the mesh was last built with and when that build finished
+    applied_parameters = None
+    preview_end = 0.0
+    preview_time = 0.0
+    preview_scheduled = False
+
+    def parameters(self) -> tuple:
+        """ Values of every property that changes the mesh """
+        return tuple(getattr(self, name) for name in type(self).__annotations__ if name != 'operator_called_from_cancel')
+
+    def preview(self, context):
+        # check() also gets called when nothing changed, for example when the popup redraws
+        if self.parameters() == self.applied_parameters:
+            return
+
+        start = perf_counter()
+        self.from_check = True
+        self.execute(context)
+        self.preview_end = perf_counter()
+        self.preview_time = self.preview_end - start
+
+    def scheduled_preview(self, override: dict):
+        try:
+            self.preview_scheduled = False
+            if self.execute_on_check:
+                with bpy.context.temp_override(**override):
+                    self.preview(bpy.context)
+        except ReferenceError:
+            # the popup closed and took the operator with it, execute already built the final values
+            pass
+        return None
+
+    def check(self, context):
+        # this will only run ---BEFORE--- "OK" button was pressed / user clicked outside of the window popup
+        # this is how we prevent the execute from running twice, because once the operator isn't in a window popup but rather locked in the bottom left corner check is still getting called and we don't need it
+        if not self.execute_on_check or self.preview_scheduled:
+            return True
+
+        # a slow build gets as much time as it took, otherwise dragging a slider would queue one build after another
+        wait = self.preview_end + max(PREVIEW_FRAME_TIME, self.preview_time) - perf_counter()
+        if wait <= 0:
+            self.preview(context)
+        else:
+            # the timer reads the values once it fires so everything that changed until then is built once
+            self.preview_scheduled = True
+            override = {'window': context.window, 'area': context.area}
+            bpy.app.timers.register(lambda: self.scheduled_preview(override), first_interval=wait)
+
+        return True
 
 
 class RePrimitive(Operator):
@@ -16,7 +76,9 @@ class RePrimitive(Operator):
     bl_idname = "object.reprimitive"
     bl_label = "Tweak Primitives"
     bl_description = "Tweak Primitives"
-    bl_options = {'REGISTER', 'UNDO'}
+
+    # The tweak operator it calls pushes the undo step once its popup is confirmed, one more here would be an empty step
+    bl_options = {'REGISTER'}
 
     # Can only be called in object mode and specifically named objects
     @classmethod
@@ -29,6 +91,12 @@ class RePrimitive(Operator):
         return ob.name.lower().startswith(names)
 
     def execute(self, context):
+
+        # With more than one primitive selected all of them get tweaked together
+        if len(selected_primitives(context)) > 1:
+            bpy.ops.object.reprimitive_batch('INVOKE_DEFAULT')
+            return {'FINISHED'}
+
         name = context.active_object.data.name.lower()
 
         if name.startswith(localization_cylinder.lower()):
@@ -46,7 +114,7 @@ class RePrimitive(Operator):
         return {'FINISHED'}
 
 
-class RePrimitiveCircle(Operator):
+class RePrimitiveCircle(LivePreview, Operator):
     """
     Tweak circle operator
     """
@@ -61,7 +129,6 @@ class RePrimitiveCircle(Operator):
     # create default values
     saved_loc = Vector((0, 0, 0))
     saved_rot = Euler((0, 0, 0))
-    Y = 0
     radius = 1
     vertices = 32
     cap_type = 'NGON'
@@ -131,16 +198,10 @@ class RePrimitiveCircle(Operator):
     def modal(self, context, event):
         return {'FINISHED'}
 
-    # this function lets us show changes from window popup live
-    def check(self, context):
-        # this will only run ---BEFORE--- "OK" button was pressed / user clicked outside of the window popup
-        # this is how we prevent the execute from running twice, because once the operator isn't in a window popup but rather locked in the bottom left corner check is still getting called and we don't need it
-        if self.execute_on_check:
-            self.from_check = True
-            self.execute(context)
-        return True
-
     def cancel(self, context):
+        # a preview that is still waiting for its timer belongs to this popup
+        self.execute_on_check = False
+
         # calling the operator again after user clicked outside of the popup but this time we're also letting it know we called it from cancel
         bpy.ops.object.reprimitive_circle(
             'INVOKE_DEFAULT', operator_called_from_cancel=True)
@@ -148,71 +209,14 @@ class RePrimitiveCircle(Operator):
     def invoke(self, context, event):
 
         ob = context.active_object
-        applied_rotation = False
+        stats.begin(self.bl_idname)
 
-        # Before any calculations are done we first hide modifiers in the viewport
-        modifiers_changed = show_or_hide_modifiers_in_viewport(ob, False)
-        # Because we are modifying parent transforms we have to remove self as their parent
-        children = save_and_unparent_children(ob.children)
-
-        self.saved_loc, self.saved_rot, self.origin = save_location_rotation(
-            ob)
+        parameters, self.saved_loc, self.saved_rot, self.origin, applied_rotation = infer_parameters(ob, 'CIRCLE')
+        for name, value in parameters.items():
+            setattr(self, name, value)
         self.align = "WORLD"
 
-        if applied_rotation_circle(ob):
-
-            # if the rotation was applied we fix it so it's truly (0,0,0)
-            applied_rotation = True
-            bpy.ops.object.fix_applied_rotation_auto()
-
-            # The cube we spawned using the custom operator holds the true object rotation
-            self.saved_rot = Euler(
-                context.scene.objects[CUBE_NAME].rotation_euler)
-            ob.rotation_euler = self.saved_rot
-            bpy.data.meshes.remove(bpy.data.meshes[CUBE_NAME])
-
-        # calculate variables
-        if (len(ob.data.polygons)) == 0:
-            self.cap_type = 'NOTHING'
-        elif (len(ob.data.polygons)) == 1:
-            self.cap_type = 'NGON'
-        else:
-            self.cap_type = 'TRIFAN'
-
-        if self.cap_type == 'TRIFAN':
-            self.vertices = int(len(ob.data.vertices)-1)
-        else:
-            self.vertices = int(len(ob.data.vertices))
-
-        self.radius = calculate_circle_radius(ob)
-        if not ob.data.uv_layers:
-            self.b_UV = False
-
-        # apply cap fill settings if they're different from the enum option drop
-        if self.cap_type != self.cap_fill:
-            self.cap_fill = self.cap_type
-
-        # after we're done we unhide modifiers in the viewport if they weren't hidden
-        if modifiers_changed:
-            show_or_hide_modifiers_in_viewport(ob, True)
-
-        restore_origin(self.origin)
-        for child in children:
-            reparent(child, ob)
-
-        # we don't have to fix the rotation if verts go through Y axis by default
-        if applied_rotation and (self.vertices-2) % 4 != 0:
-
-            # if uneven we can just rotate on Z by 90 degrees
-            if self.vertices % 2 != 0:
-                self.saved_rot = rotate_around_axis_followed_by_euler_rotation(
-                    'Z', pi/2, self.saved_rot)
-
-            # otherwise we have to calculate the angle between sides and divide it with -2
-            else:
-                z_offset = calculate_z_offset(self.vertices)
-                self.saved_rot = rotate_around_axis_followed_by_euler_rotation(
-                    'Z', z_offset, self.saved_rot)
+        if applied_rotation:
 
             # if the user invokes the operator but doesn't do anything and clicks away instead of pressing ok-> execute doesn't go off
             # we're force calling execute to fix the rotation
@@ -228,9 +232,11 @@ class RePrimitiveCircle(Operator):
             return context.window_manager.invoke_props_dialog(self)
 
     def execute(self, context):
+        stats.begin(self.bl_idname, keep=stats.INVOKE_STAGES)
 
         replace_circle(self.vertices, self.radius, self.cap_fill,
                        self.saved_loc, self.saved_rot, self.align, self.b_UV, self.origin)
+        self.applied_parameters = self.parameters()
 
         # if execute was ran from check function set to false so execute can run from there again
         if self.from_check:
@@ -238,11 +244,12 @@ class RePrimitiveCircle(Operator):
         # if execute was ran from clicking "OK" or clicking away then disable check from running it again
         else:
             self.execute_on_check = False
+            self.report({'INFO'}, stats.summary())
 
         return {'FINISHED'}
 
 
-class RePrimitiveCone(Operator):
+class RePrimitiveCone(LivePreview, Operator):
     """
     Tweak cone operator
     """
@@ -257,7 +264,6 @@ class RePrimitiveCone(Operator):
     # create default values
     saved_loc = Vector((0, 0, 0))
     saved_rot = Euler((0, 0, 0))
-    Y = 0
     depth = 2
     radius1 = 1
     radius2 = 0
@@ -344,86 +350,30 @@ class RePrimitiveCone(Operator):
     def modal(self, context, event):
         return {'FINISHED'}
 
-    # this function lets us show changes from window popup live
-    def check(self, context):
-        # this will only run ---BEFORE--- "OK" button was pressed / user clicked outside of the window popup
-        # this is how we prevent the execute from running twice, because once the operator isn't in a window popup but rather locked in the bottom left corner check is still getting called and we don't need it
-        if self.execute_on_check:
-            self.from_check = True
-            self.execute(context)
-        return True
-
     def cancel(self, context):
+        # a preview that is still waiting for its timer belongs to this popup
+        self.execute_on_check = False
+
         # calling the operator again after user clicked outside of the popup but this time we're also letting it know we called it from cancel
         bpy.ops.object.reprimitive_cone(
             'INVOKE_DEFAULT', operator_called_from_cancel=True)
 
     def invoke(self, context, event):
 
-        applied_rotation = False
-        ob = context.object
-
-        # Before any calculations are done we first hide modifiers in the viewport
-        modifiers_changed = show_or_hide_modifiers_in_viewport(ob, False)
-
-        # Because we are modifying parent transforms we have to remove self as their parent
-        children = save_and_unparent_children(ob.children)
-
-        if applied_rotation_cone_or_cylinder(ob):
-            applied_rotation = True
-
-            # The cube we spawned using the custom operator holds the true object rotation
-            bpy.ops.object.fix_applied_rotation_auto()
-            self.saved_rot = Euler(
-                context.scene.objects[CUBE_NAME].rotation_euler)
-            ob.rotation_euler = self.saved_rot
-            bpy.data.meshes.remove(bpy.data.meshes[CUBE_NAME])
-
-        # Save origin first since is_cone_cylindrical changes it
-        self.origin = Vector(ob.location)
-        self.radius1, self.radius2, self.vertices, self.cap_type, sharp_tipped = calculate_cone_properties(
-            ob)
-
-        # Sadly origin to geometry doesn't work for cones so we have to fix it manually,
-        # origin to geometry 'BOUNDS' almost works but it's not perfect because it doesn't work for uneven side cones
-        if sharp_tipped:
-            self.saved_loc, self.saved_rot, _ = fix_cone_origin_and_save_location_rotation(
-                ob,  applied_rotation or self.radius1 < self.radius2)  # Meaning upsidedown
-        else:  # Cylindrical
-            self.saved_loc, self.saved_rot, _ = save_location_rotation(ob)
+        ob = context.active_object
+        stats.begin(self.bl_idname)
 
-        # calculate variables
+        parameters, self.saved_loc, self.saved_rot, self.origin, applied_rotation = infer_parameters(ob, 'CONE')
+        for name, value in parameters.items():
+            setattr(self, name, value)
         self.align = "WORLD"
-        self.Y = ob.dimensions.y
-        self.depth = ob.dimensions.z
-        if not ob.data.uv_layers:
-            self.b_UV = False
-
-        # apply cap fill settings if they're different from the enum option drop
-        if self.cap_type != self.cap_fill:
-            self.cap_fill = self.cap_type
-
-        # after we're done we unhide modifiers in the viewport if they weren't hidden
-        if modifiers_changed:
-            show_or_hide_modifiers_in_viewport(ob, True)
 
-        # We don't have to fix the rotation if edges go through Y axis by default
-        if applied_rotation and (self.vertices-2) % 4:
-
-            # if uneven we can just rotate on Z by 90 degrees
-            if self.vertices % 2:
-                self.saved_rot = rotate_around_axis_followed_by_euler_rotation(
-                    'Z', pi/2, self.saved_rot)
-
-            # otherwise we have to calculate the angle between sides and divide it with -2
-            else:
-                z_offset = calculate_z_offset(self.vertices)
-                self.saved_rot = rotate_around_axis_followed_by_euler_rotation(
-                    'Z', z_offset, self.saved_rot)
+        if applied_rotation:
 
-        restore_origin(self.origin)
-        for child in children:
-            reparent(child, ob)
+            # if the user invokes the operator but doesn't do anything and clicks away instead of pressing ok-> execute doesn't go off
+            # we're force calling execute to fix the rotation
+            self.from_check = True
+            self.execute(context)
 
         # Show operator in bottom left corner if user clicked away
         if self.operator_called_from_cancel:
@@ -434,9 +384,11 @@ class RePrimitiveCone(Operator):
             return context.window_manager.invoke_props_dialog(self)
 
     def execute(self, context):
+        stats.begin(self.bl_idname, keep=stats.INVOKE_STAGES)
 
         replace_cone(self.vertices, self.radius1, self.radius2, self.depth, self.cap_fill,
                      self.saved_loc, self.saved_rot, self.align, self.b_UV, self.origin)
+        self.applied_parameters = self.parameters()
 
         # if execute was ran from check function set to false so execute can run from there again
         if self.from_check:
@@ -444,11 +396,12 @@ class RePrimitiveCone(Operator):
         # if execute was ran from clicking "OK" or clicking away then disable check from running it again
         else:
             self.execute_on_check = False
+            self.report({'INFO'}, stats.summary())
 
         return {'FINISHED'}
 
 
-class RePrimitiveCylinder(Operator):
+class RePrimitiveCylinder(LivePreview, Operator):
     """ Tweak cylinder operator """
     bl_idname = "object.reprimitive_cylinder"
     bl_label = "Tweak Cylinder"
@@ -461,7 +414,6 @@ class RePrimitiveCylinder(Operator):
     # create default values
     saved_loc = Vector((0, 0, 0))
     saved_rot = Euler((0, 0, 0))
-    Y = 0
     depth = 2
     radius = 1
     vertices = 32
@@ -535,16 +487,10 @@ class RePrimitiveCylinder(Operator):
     def modal(self, context, event):
         return {'FINISHED'}
 
-    # this function lets us show changes from window popup live
-    def check(self, context):
-        # this will only run ---BEFORE--- "OK" button was pressed / user clicked outside of the window popup
-        # this is how we prevent the execute from running twice, because once the operator isn't in a window popup but rather locked in the bottom left corner check is still getting called and we don't need it
-        if self.execute_on_check:
-            self.from_check = True
-            self.execute(context)
-        return True
-
     def cancel(self, context):
+        # a preview that is still waiting for its timer belongs to this popup
+        self.execute_on_check = False
+
         # calling the operator again after user clicked outside of the popup but this time we're also letting it know we called it from cancel
         bpy.ops.object.reprimitive_cylinder(
             'INVOKE_DEFAULT', operator_called_from_cancel=True)
@@ -552,64 +498,14 @@ class RePrimitiveCylinder(Operator):
     def invoke(self, context, event):
 
         ob = context.active_object
-        applied_rotation = False
-
-        # Before any calculations are done we first hide modifiers in the viewport
-        modifiers_changed = show_or_hide_modifiers_in_viewport(ob, False)
-        # Because we are modifying parent transforms we have to remove self as their parent
-        children = save_and_unparent_children(ob.children)
+        stats.begin(self.bl_idname)
 
-        self.saved_loc, self.saved_rot, self.origin = save_location_rotation(
-            ob)
+        parameters, self.saved_loc, self.saved_rot, self.origin, applied_rotation = infer_parameters(ob, 'CYLINDER')
+        for name, value in parameters.items():
+            setattr(self, name, value)
         self.align = "WORLD"
 
-        # Was the rotation really applied?
-        if applied_rotation_cone_or_cylinder(ob):
-
-            applied_rotation = True
-
-            # if the rotation was applied we fix it so it's truly (0,0,0)
-            bpy.ops.object.fix_applied_rotation_auto()
-            self.saved_rot = Euler(
-                context.scene.objects[CUBE_NAME].rotation_euler)
-            ob.rotation_euler = self.saved_rot
-            bpy.data.meshes.remove(bpy.data.meshes[CUBE_NAME])
-
-        # Calculate variables
-        self.Y = ob.dimensions[1]
-        self.depth = ob.dimensions[2]
-        self.radius, self.vertices, self.cap_type = calculate_cylinder_properties(
-            ob)
-
-        if not ob.data.uv_layers:
-            self.b_UV = False
-
-        # Apply cap fill settings if they're different from the enum option drop
-        if self.cap_type != self.cap_fill:
-            self.cap_fill = self.cap_type
-
-        # After we're done we unhide modifiers in the viewport if they weren't hidden
-        if modifiers_changed:
-            show_or_hide_modifiers_in_viewport(ob, True)
-
-        restore_origin(self.origin)
-        for child in children:
-            reparent(child, ob)
-
-        # We don't have to fix rotation if Y axis goes through 2 cylinder edges, that happens when (vertices-2)%4==0
-        # look at https://drive.google.com/file/d/1_p8GNj4fXDeyflXOhAiwfcR8xGuOf8Lj/view?usp=sharing
-        if applied_rotation and (self.vertices-2) % 4 != 0:
-
-            # if uneven we can just rotate on Z by 90 degrees
-            if self.vertices % 2 != 0:
-                self.saved_rot = rotate_around_axis_followed_by_euler_rotation(
-                    'Z', pi/2, self.saved_rot)
-
-            # otherwise we have to calculate the angle between sides and divide it with -2
-            else:
-                z_offset = calculate_z_offset(self.vertices)
-                self.saved_rot = rotate_around_axis_followed_by_euler_rotation(
-                    'Z', z_offset, self.saved_rot)
+        if applied_rotation:
 
             # if the user invokes the operator but doesn't do anything and clicks away instead of pressing ok-> execute doesn't go off
             # we're force calling execute to fix the rotation
@@ -625,9 +521,11 @@ class RePrimitiveCylinder(Operator):
             return context.window_manager.invoke_props_dialog(self)
 
     def execute(self, context):
+        stats.begin(self.bl_idname, keep=stats.INVOKE_STAGES)
 
         replace_cylinder(self.vertices, self.radius, self.depth, self.cap_fill, self.saved_loc, self.saved_rot,
                          self.align, self.b_UV, self.origin)
+        self.applied_parameters = self.parameters()
 
         # if execute was ran from check function set to false so execute can run from there again
         if self.from_check:
@@ -635,11 +533,12 @@ class RePrimitiveCylinder(Operator):
         # if execute was ran from clicking "OK" or clicking away then disable check from running it again
         else:
             self.execute_on_check = False
+            self.report({'INFO'}, stats.summary())
 
         return {'FINISHED'}
 
 
-class RePrimitiveIcoSphere(Operator):
+class RePrimitiveIcoSphere(LivePreview, Operator):
     """
     Tweak icosphere operator
     """
@@ -656,7 +555,6 @@ class RePrimitiveIcoSphere(Operator):
     saved_rot = Euler((0, 0, 0))
     subdivisions = 2
     radius = 1
-    Y = 0
     align_type = 'WORLD'
     b_UV = True
     origin = 0
@@ -713,16 +611,10 @@ class RePrimitiveIcoSphere(Operator):
     def modal(self, context, event):
         return {'FINISHED'}
 
-    # this function lets us show changes from window popup live
-    def check(self, context):
-        # this will only run ---BEFORE--- "OK" button was pressed / user clicked outside of the window popup
-        # this is how we prevent the execute from running twice, because once the operator isn't in a window popup but rather locked in the bottom left corner check is still getting called and we don't need it
-        if self.execute_on_check:
-            self.from_check = True
-            self.execute(context)
-        return True
-
     def cancel(self, context):
+        # a preview that is still waiting for its timer belongs to this popup
+        self.execute_on_check = False
+
         # calling the operator again after user clicked outside of the popup but this time we're also letting it know we called it from cancel
         bpy.ops.object.reprimitive_icosphere(
             'INVOKE_DEFAULT', operator_called_from_cancel=True)
@@ -730,50 +622,15 @@ class RePrimitiveIcoSphere(Operator):
     def invoke(self, context, event):
 
         ob = context.active_object
-        applied_rotation = False
-
-        # Before any calculations are done we first hide modifiers in the viewport
-        modifiers_changed = show_or_hide_modifiers_in_viewport(ob, False)
-
-        # Because we are modifying parent transforms we have to remove self as their parent
-        children = save_and_unparent_children(ob.children)
+        stats.begin(self.bl_idname)
 
-        self.saved_loc, self.saved_rot, self.origin = save_location_rotation(
-            ob)
+        parameters, self.saved_loc, self.saved_rot, self.origin, applied_rotation = infer_parameters(ob, 'ICOSPHERE')
+        for name, value in parameters.items():
+            setattr(self, name, value)
         self.align = "WORLD"
 
-        if applied_rotation_sphere(ob):
-
-            # if the rotation was applied we fix it so it's truly (0,0,0)
-            applied_rotation = True
-            bpy.ops.object.fix_applied_rotation_auto()
-
-            # The cube we spawned using the custom operator holds the true object rotation
-            self.saved_rot = Euler(
-                context.scene.objects[CUBE_NAME].rotation_euler)
-            bpy.data.meshes.remove(bpy.data.meshes[CUBE_NAME])
-
-        # calculate variables
-        self.Y = ob.dimensions[1]
-        self.radius = calculate_icosphere_radius(ob)
-        self.subdivisions = int(log(len(ob.data.polygons)/20, 4)+1)
-        if not ob.data.uv_layers:
-            self.b_UV = False
-
-        # after we're done we unhide modifiers in the viewport if they weren't hidden
-        if modifiers_changed:
-            show_or_hide_modifiers_in_viewport(ob, True)
-
-        restore_origin(self.origin)
-        for child in children:
-            reparent(child, ob)
-
         if applied_rotation:
 
-            # unlike other objects icosphere only needs to be rotated on Z for 180
-            self.saved_rot = rotate_around_axis_followed_by_euler_rotation(
-                "Z", pi, self.saved_rot)
-
             # if the user invokes the operator but doesn't do anything and clicks away instead of pressing ok-> execute doesn't go off
             # we're force calling execute to fix the rotation
             self.from_check = True
@@ -788,9 +645,11 @@ class RePrimitiveIcoSphere(Operator):
             return context.window_manager.invoke_props_dialog(self)
 
     def execute(self, context):
+        stats.begin(self.bl_idname, keep=stats.INVOKE_STAGES)
 
         replace_icosphere(self.subdivisions, self.radius, self.saved_loc,
                           self.saved_rot, self.align, self.b_UV, self.origin)
+        self.applied_parameters = self.parameters()
 
         # if execute was ran from check function set to false so execute can run from there again
         if self.from_check:
@@ -798,11 +657,12 @@ class RePrimitiveIcoSphere(Operator):
         # if execute was ran from clicking "OK" or clicking away then disable check from running it again
         else:
             self.execute_on_check = False
+            self.report({'INFO'}, stats.summary())
 
         return {'FINISHED'}
 
 
-class RePrimitiveTorus(Operator):
+class RePrimitiveTorus(LivePreview, Operator):
     """
     Tweak torus operator
     """
@@ -891,16 +751,10 @@ class RePrimitiveTorus(Operator):
         col_1.label(text="Align")
         col_2.prop(self, "align")
 
-    # this function lets us show changes from window popup live
-    def check(self, context):
-        # this will only run ---BEFORE--- "OK" button was pressed / user clicked outside of the window popup
-        # this is how we prevent the execute from running twice, because once the operator isn't in a window popup but rather locked in the bottom left corner check is still getting called and we don't need it
-        if self.execute_on_check:
-            self.from_check = True
-            self.execute(context)
-        return True
-
     def cancel(self, context):
+        # a preview that is still waiting for its timer belongs to this popup
+        self.execute_on_check = False
+
         # calling the operator again after user clicked outside of the popup but this time we're also letting it know we called it from cancel
         bpy.ops.object.reprimitive_torus(
             'INVOKE_DEFAULT', operator_called_from_cancel=True)
@@ -910,81 +764,16 @@ class RePrimitiveTorus(Operator):
 
     def invoke(self, context, event):
 
-        applied_rotation = False
         ob = context.active_object
+        stats.begin(self.bl_idname)
 
-        # Before any calculations are done we first hide modifiers in the viewport
-        modifiers_changed = show_or_hide_modifiers_in_viewport(ob, False)
-        # Because we are modifying parent transforms we have to remove self as their parent
-        children = save_and_unparent_children(ob.children)
-
-        self.saved_loc, self.saved_rot, self.origin = save_location_rotation(
-            ob)
+        parameters, self.saved_loc, self.saved_rot, self.origin, applied_rotation = infer_parameters(ob, 'TORUS')
+        for name, value in parameters.items():
+            setattr(self, name, value)
         self.align = "WORLD"
 
-        if applied_rotation_torus(ob):
-
-            # if the rotation was applied we fix it so it's truly (0,0,0)
-            applied_rotation = True
-            bpy.ops.object.fix_applied_rotation_auto()
-
-            # The cube we spawned using the custom operator holds the true object rotation
-            self.saved_rot = Euler(
-                context.scene.objects[CUBE_NAME].rotation_euler)
-            ob.rotation_euler = self.saved_rot
-            bpy.data.meshes.remove(bpy.data.meshes[CUBE_NAME])
-
-        # calculate variables
-        self.major_segments = calculate_torus_major_segments(ob)
-        self.minor_segments = len(ob.data.vertices)//self.major_segments
-        tip_vert, neighbour_vert = find_tip_and_neighbour_vert(ob)
-        self.minor_radius = calculate_polygon_radius(
-            self.minor_segments, tip_vert, neighbour_vert)
-
-        if not context.object.data.uv_layers:
-            self.b_UV = False
-
-        # save location, reset it and apply it, we need this for the next part because we're comparing distance to (0,0,0)
-        saved_loc = Vector(ob.location)
-        ob.location = (0, 0, 0)
-        bpy.ops.object.transform_apply(
-            location=True, rotation=False, scale=False)
-
-        # subtract minor radius from the distance between first selected vert and the middle
-        self.major_radius = vector_distance(
-            tip_vert, Vector((0, 0, 0))) - self.minor_radius
-
-        # restore location
-        ob.location = saved_loc
-
-        # after we're done we unhide modifiers in the viewport if they weren't hidden
-        if modifiers_changed:
-            show_or_hide_modifiers_in_viewport(ob, True)
-
-        restore_origin(self.origin)
-        for child in children:
-            reparent(child, ob)
-
-        # if the rotation was applied first rotate it by offset on Z, then rotate based on saved rotation
-        # look at https://drive.google.com/file/d/1xI0NubgaogZtGhrnmRr2wZmjqGRCSeW4/view?usp=sharing
         if applied_rotation:
 
-            # if you were to cut torus on both X and Y and the quarter piece you get was symmetrical to itself
-            if self.major_segments % 4 == 0:
-                z_offset = calculate_z_offset(self.major_segments)
-                self.saved_rot = rotate_around_axis_followed_by_euler_rotation(
-                    'Z', z_offset, self.saved_rot)
-
-            # if torus is symmetrical on both X and Y but the quarter piece isn't symmetrical
-            elif self.major_segments % 2 == 0:
-                self.saved_rot = rotate_around_axis_followed_by_euler_rotation(
-                    'Z', pi/2, self.saved_rot)
-
-            # if torus is only symmetrical on 1 axis
-            else:
-                self.saved_rot = rotate_around_axis_followed_by_euler_rotation(
-                    'Z', pi, self.saved_rot)
-
             # if the user invokes the operator but doesn't do anything and clicks away instead of pressing ok-> execute doesn't go off
             # we're force calling execute to fix the rotation
             self.from_check = True
@@ -999,9 +788,11 @@ class RePrimitiveTorus(Operator):
             return context.window_manager.invoke_props_dialog(self)
 
     def execute(self, context):
+        stats.begin(self.bl_idname, keep=stats.INVOKE_STAGES)
 
         replace_torus(self.major_segments, self.minor_segments, self.major_radius, self.minor_radius,
                       self.saved_loc, self.saved_rot, self.align, self.b_UV, self.origin)
+        self.applied_parameters = self.parameters()
 
         # if execute was ran from check function set to false so execute can run from there again
         if self.from_check:
@@ -1009,11 +800,12 @@ class RePrimitiveTorus(Operator):
         # if execute was ran from clicking "OK" or clicking away then disable check from running it again
         else:
             self.execute_on_check = False
+            self.report({'INFO'}, stats.summary())
 
         return {'FINISHED'}
 
 
-class RePrimitiveUVSphere(Operator):
+class RePrimitiveUVSphere(LivePreview, Operator):
     """
     Tweak UVSphere operator
     """
@@ -1099,76 +891,25 @@ class RePrimitiveUVSphere(Operator):
     def modal(self, context, event):
         return {'FINISHED'}
 
-    # this function lets us show changes from window popup live
-    def check(self, context):
-        # this will only run ---BEFORE--- "OK" button was pressed / user clicked outside of the window popup
-        # this is how we prevent the execute from running twice, because once the operator isn't in a window popup but rather locked in the bottom left corner check is still getting called and we don't need it
-        if self.execute_on_check:
-            self.from_check = True
-            self.execute(context)
-        return True
-
     def cancel(self, context):
+        # a preview that is still waiting for its timer belongs to this popup
+        self.execute_on_check = False
+
         # calling the operator again after user clicked outside of the popup but this time we're also letting it know we called it from cancel
         bpy.ops.object.reprimitive_sphere(
             'INVOKE_DEFAULT', operator_called_from_cancel=True)
 
     def invoke(self, context, event):
 
-        applied_rotation = False
         ob = context.active_object
+        stats.begin(self.bl_idname)
 
-        # before any calculations are done we first hide modifiers in the viewport
-        modifiers_changed = show_or_hide_modifiers_in_viewport(ob, False)
-        # Because we are modifying parent transforms we have to remove self as their parent
-        children = save_and_unparent_children(ob.children)
-
-        self.saved_loc, self.saved_rot, self.origin = save_location_rotation(
-            ob)
+        parameters, self.saved_loc, self.saved_rot, self.origin, applied_rotation = infer_parameters(ob, 'UV_SPHERE')
+        for name, value in parameters.items():
+            setattr(self, name, value)
         self.align = "WORLD"
 
-        if applied_rotation_sphere(ob):
-
-            # if the rotation was applied we fix it so it's truly (0,0,0)
-            applied_rotation = True
-            bpy.ops.object.fix_applied_rotation_auto()
-
-            # The cube we spawned using the custom operator holds the true object rotation
-            self.saved_rot = Euler(
-                context.scene.objects[CUBE_NAME].rotation_euler)
-            ob.rotation_euler = self.saved_rot
-            bpy.data.meshes.remove(bpy.data.meshes[CUBE_NAME])
-
-        # calculate variables
-        self.depth = ob.dimensions[2]
-        self.radius = self.depth/2
-        self.segments = calculate_sphere_segments(ob)
-        self.rings = len(ob.data.polygons)//self.segments
-
-        if not context.object.data.uv_layers:
-            self.b_UV = False
-
-        # after we're done we unhide modifiers in the viewport if they weren't hidden
-        if modifiers_changed:
-            show_or_hide_modifiers_in_viewport(ob, True)
-
-        restore_origin(self.origin)
-        for child in children:
-            reparent(child, ob)
-
-        # we don't have to fix the rotation if edges go through Y axis by default
-        if applied_rotation and (self.segments-2) % 4 != 0:
-
-            # if uneven we can just rotate on Z by 90 degrees
-            if self.segments % 2 != 0:
-                self.saved_rot = rotate_around_axis_followed_by_euler_rotation(
-                    'Z', pi/2, self.saved_rot)
-
-            # otherwise we have to calculate the angle between sides and divide it with -2
-            else:
-                z_offset = calculate_z_offset(self.segments)
-                self.saved_rot = rotate_around_axis_followed_by_euler_rotation(
-                    'Z', z_offset, self.saved_rot)
+        if applied_rotation:
 
             # if the user invokes the operator but doesn't do anything and clicks away instead of pressing ok-> execute doesn't go off
             # we're force calling execute to fix the rotation
@@ -1184,9 +925,11 @@ class RePrimitiveUVSphere(Operator):
             return context.window_manager.invoke_props_dialog(self)
 
     def execute(self, context):
+        stats.begin(self.bl_idname, keep=stats.INVOKE_STAGES)
 
         replace_uv_sphere(self.segments, self.rings, self.radius,
                           self.saved_loc, self.saved_rot, self.align, self.b_UV, self.origin)
+        self.applied_parameters = self.parameters()
 
         # if execute was ran from check function set to false so execute can run from there again
         if self.from_check:
@@ -1194,123 +937,175 @@ class RePrimitiveUVSphere(Operator):
         # if execute was ran from clicking "OK" or clicking away then disable check from running it again
         else:
             self.execute_on_check = False
+            self.report({'INFO'}, stats.summary())
 
         return {'FINISHED'}
 
 
-class FixAppliedRotationAuto(Operator):
-    """ Fixes applied rotation and keeps a cube that we use to rotate the main object, user can't call manually call this class"""
-    bl_idname = "object.fix_applied_rotation_auto"
-    bl_label = "Fix Applied Rotation"
-    bl_options = {'REGISTER', 'UNDO', 'INTERNAL'}
+# Tweak operator and the parameters(property name, label) the batch dialog shows for every primitive
+BATCH_PARAMETERS = {
+    'CYLINDER': (RePrimitiveCylinder, (('vertices', "Vertices"), ('radius', "Radius"), ('depth', "Depth"),
+                                       ('cap_fill', "Cap Fill Type"), ('b_UV', "Generate UVs"))),
+    'CONE': (RePrimitiveCone, (('vertices', "Vertices"), ('radius1', "Radius 1"), ('radius2', "Radius 2"), ('depth', "Depth"),
+                               ('cap_fill', "Base Fill Type"), ('b_UV', "Generate UVs"))),
+    'CIRCLE': (RePrimitiveCircle, (('vertices', "Vertices"), ('radius', "Radius"), ('cap_fill', "Fill Type"), ('b_UV', "Generate UVs"))),
+    'TORUS': (RePrimitiveTorus, (('major_segments', "Major Segments"), ('minor_segments', "Minor Segments"),
+                                 ('major_radius', "Major Radius"), ('minor_radius', "Minor Radius"), ('b_UV', "Generate UVs"))),
+    'UV_SPHERE': (RePrimitiveUVSphere, (('segments', "Segments"), ('rings', "Rings"), ('radius', "Radius"), ('b_UV', "Generate UVs"))),
+    'ICOSPHERE': (RePrimitiveIcoSphere, (('subdivisions', "Subdivisions"), ('radius', "Radius"), ('b_UV', "Generate UVs"))),
+}
 
-    def execute(self, context):
 
-        # Save original object ref and its parent, then unparent and save location
-        ob = context.active_object
-        parent = ob.parent
-        bpy.ops.object.parent_clear(type='CLEAR_KEEP_TRANSFORM')
-        saved_location = Vector(ob.location)
+def clamp_parameter(primitive: str, name: str, value):
+    """ Limits a value the same way the property of the tweak operator would, raises KeyError for names it doesn't have """
+    keywords = BATCH_PARAMETERS[primitive][0].__annotations__[name].keywords
+    if 'min' in keywords:
+        value = max(value, keywords['min'])
+    if 'max' in keywords:
+        value = min(value, keywords['max'])
+    return value
+
+
+def selected_primitives(context) -> list[tuple[bpy.types.Object, str]]:
+    """ Every selected mesh object we recognize as a primitive, with its type """
+    selected = ((ob, primitive_type(ob)) for ob in context.selected_objects if ob.type == 'MESH')
+    return [(ob, primitive) for ob, primitive in selected if primitive]
+
 
-        # Set the location to 0 so some of the smart selection that compares to the (0,0,0) Vector would work
-        ob.location = (0, 0, 0)
+class RePrimitiveBatch(Operator):
+    """
+    Tweak every selected primitive at once, one section per primitive type
+    Checked values are set on every primitive of that type, in relative mode counts get an offset and sizes a factor
+    """
+    bl_idname = "object.reprimitive_batch"
+    bl_label = "Tweak Selected Primitives"
+    bl_options = {'REGISTER', 'UNDO', 'INTERNAL'}
 
-        # Save view
-        rv = context.space_data.region_3d
-        matrix = rv.view_matrix
+    # The rest of the properties are added below the class, one set for every parameter of every primitive type
+    mode: EnumProperty(
+        name="",
+        description="How the checked values change the primitives",
+        items=[('ABSOLUTE', "Absolute", "Set the checked values on every primitive"),
+               ('RELATIVE', "Relative", "Add to the checked counts and multiply the checked sizes of every primitive")],
+        default='ABSOLUTE')
+
+    def fill_values(self, context):
+        """ Absolute values start at what the first primitive of every type has, relative ones change nothing """
+        first = {}
+        for ob, primitive in selected_primitives(context):
+            first.setdefault(primitive, ob)
+
+        for primitive, ob in first.items():
+            parameters = infer_parameters(ob, primitive)[0]
+            for name, _ in BATCH_PARAMETERS[primitive][1]:
+                setattr(self, batch_property(primitive, name), parameters[name])
 
-        # Use smart selection when in object mode, only works for simple objects
-        if context.mode == 'OBJECT':
+    def draw(self, context):
 
-            # Enter edit mode and deselect everything, then change selection to vertices
-            bpy.ops.object.editmode_toggle()
-            bpy.ops.mesh.select_all(action='DESELECT')
-            context.tool_settings.mesh_select_mode = (True, False, False)
-            smart_selection(context.active_object)
+        layout = self.layout
+        layout.prop(self, "mode", expand=True)
+        relative = self.mode == 'RELATIVE'
+
+        counts = {}
+        for _, primitive in selected_primitives(context):
+            counts[primitive] = counts.get(primitive, 0) + 1
+
+        for primitive, count in counts.items():
+            box = layout.box()
+            box.label(text=f"{primitive.replace('_', ' ').title()} ({count})")
+            split = box.split(factor=0.4)
+            col_1 = split.column()
+            col_2 = split.column()
+
+            for name, label in BATCH_PARAMETERS[primitive][1]:
+                key = batch_property(primitive, name)
+                col_1.prop(self, "use_" + key, text=label)
+
+                # Enums and bools are always set, there is nothing relative about them
+                row = col_2.row()
+                row.active = getattr(self, "use_" + key)
+                if relative and hasattr(self, key + "_offset"):
+                    row.prop(self, key + "_offset", text="+")
+                elif relative and hasattr(self, key + "_factor"):
+                    row.prop(self, key + "_factor", text="×")
+                else:
+                    row.prop(self, key, text="")
 
-        # Use whatever is selected, if nothing is then we use smart selection just like in object mode
-        elif context.mode == 'EDIT_MESH':
+    def invoke(self, context, event):
 
-            # Reenter edit mode to confirm the selection
-            bpy.ops.object.editmode_toggle()
-            bpy.ops.object.editmode_toggle()
+        # Nothing is checked until the user says so, then the values start from the first primitive of each type
+        for name in type(self).__annotations__:
+            if name.startswith("use_"):
+                setattr(self, name, False)
+            elif name.endswith("_offset"):
+                setattr(self, name, 0)
+            elif name.endswith("_factor"):
+                setattr(self, name, 1.0)
+        self.fill_values(context)
+
+        return context.window_manager.invoke_props_dialog(self)
+
+    def edited(self, primitive: str, parameters: dict) -> dict:
+        """ Parameters of one primitive after the checked values of its type are applied """
+
+        relative = self.mode == 'RELATIVE'
+        for name, _ in BATCH_PARAMETERS[primitive][1]:
+            key = batch_property(primitive, name)
+            if not getattr(self, "use_" + key):
+                continue
+
+            if relative and hasattr(self, key + "_offset"):
+                value = parameters[name] + getattr(self, key + "_offset")
+            elif relative and hasattr(self, key + "_factor"):
+                value = parameters[name] * getattr(self, key + "_factor")
+            else:
+                value = getattr(self, key)
 
-            # Is nothing selected?
-            if len([v for v in context.active_object.data.vertices if v.select]) == 0:
-                smart_selection(context.active_object)
+            # Relative edits can go past what the tweak operator allows
+            parameters[name] = clamp_parameter(primitive, name, value)
 
-            # Are more than 2 faces selected? We have to flatten the selected faces into 1
-            elif len([f for f in context.active_object.data.polygons if f.select]) > 2:
+        return parameters
 
-                bpy.ops.mesh.duplicate()
-                bpy.ops.transform.resize(value=(1, 1, 0), orient_type='NORMAL')
-                bpy.ops.transform.translate(value=(0, 0, 2))
-                bpy.ops.mesh.dissolve_edges()
+    def execute(self, context):
 
-                # Align view to the selected face, then delete it
-                bpy.ops.view3d.view_axis(type='TOP', align_active=True)
-                bpy.ops.mesh.delete(type='EDGE')
+        stats.begin(self.bl_idname)
+        primitives = selected_primitives(context)
 
-            # Use whatever is selected
-            else:
-                bpy.ops.view3d.view_axis(type='TOP', align_active=True)
-
-        # Deselect all faces and return to object mode
-        bpy.ops.mesh.select_all(action='DESELECT')
-        bpy.ops.object.editmode_toggle()
-
-        # Spawn two cubes:
-        # 1. used to fix the rotation so it's truly (0,0,0)
-        # 2. store the rotation we find out an applied object had, we will read from this cube since we can't return values from operators
-        bpy.ops.mesh.primitive_cube_add(location=saved_location, align='VIEW')
-        context.active_object.name = CUBE_NAME
-        context.active_object.data.name = CUBE_NAME
-
-        # cube number 1, we use this one in this operator
-        bpy.ops.mesh.primitive_cube_add(location=saved_location, align='VIEW')
-        cube = context.active_object
-        # +1 because two objects can't share the same mesh name
-        cube.data.name = CUBE_NAME+"1"
-
-        # Deselect everything and select original object, followed by the cube, then parent it to the cube
-        bpy.ops.object.select_all(action='DESELECT')
-        ob.select_set(True)
-        cube.select_set(True)
-        bpy.ops.object.parent_set(type='OBJECT', keep_transform=False)
-
-        # Deselect everything again and select the cube
-        bpy.ops.object.select_all(action='DESELECT')
-        cube.select_set(True)
-
-        # Reset rotation of the cube
-        bpy.ops.object.rotation_clear(clear_delta=False)
-
-        # Deselect everything again and select the original object
-        bpy.ops.object.select_all(action='DESELECT')
-        ob.select_set(True)
-
-        # Clear parent and keep transform, after that apply the rotation
-        bpy.ops.object.parent_clear(type='CLEAR_KEEP_TRANSFORM')
-        bpy.ops.object.transform_apply(
-            location=False, rotation=True, scale=False)
-
-        # Delete the helper cube
-        bpy.data.meshes.remove(bpy.data.meshes[CUBE_NAME+"1"])
-
-        # restore saved view and reselect the original object
-        rv.view_perspective = 'PERSP'
-        rv.view_matrix = matrix
-        context.view_layer.objects.active = ob
-
-        # Restore original location and parent if it existed
-        ob.location = saved_location
-        if parent:
-            ob.parent = parent
-            ob.matrix_parent_inverse = parent.matrix_world.inverted()
+        # Every primitive is read and rebuilt on its own, nothing here touches the selection, the active object or the mode
+        for ob, primitive in primitives:
+            parameters, location, rotation, origin, _ = infer_parameters(ob, primitive)
+            replace_primitive(ob, primitive, self.edited(primitive, parameters), location, rotation, 'WORLD', origin)
+
+        self.report({'INFO'}, f"Tweaked {len(primitives)} primitives in {stats.summary()}")
 
         return {'FINISHED'}
 
 
+def batch_property(primitive: str, name: str) -> str:
+    """ Name of the batch property that holds given parameter of a primitive type """
+    return f"{primitive.lower()}_{name}"
+
+
+def add_batch_properties() -> None:
+    """ Every parameter of every type gets its own property(the same one the tweak operator uses), a checkbox and a relative counterpart """
+
+    annotations = RePrimitiveBatch.__annotations__
+    for primitive, (operator, names) in BATCH_PARAMETERS.items():
+        for name, label in names:
+            key = batch_property(primitive, name)
+            prop = operator.__annotations__[name]
+            annotations[key] = prop
+            annotations["use_" + key] = BoolProperty(name=label, default=False)
+
+            if prop.function is IntProperty:
+                annotations[key + "_offset"] = IntProperty(name="", default=0)
+            elif prop.function is FloatProperty:
+                annotations[key + "_factor"] = FloatProperty(name="", default=1, min=0)
+
+
+add_batch_properties()
+
+
 class FixAppliedRotation(Operator):
     """ Fix applied rotation so it is truly (0,0,0). """
     bl_idname = "object.fix_applied_rotation"
@@ -1324,29 +1119,23 @@ class FixAppliedRotation(Operator):
     def execute(self, context):
 
         ob = context.active_object
+        editing = context.mode == 'EDIT_MESH'
+        stats.begin(self.bl_idname)
 
-        # For torus we have to fix the location first before fixing the rotation
-        if (ob.name.startswith(localization_torus)):
-            bpy.ops.object.origin_set(type='ORIGIN_GEOMETRY', center='MEDIAN')
-
-        # The cube we spawned using the custom operator holds the true object rotation
-        bpy.ops.object.fix_applied_rotation_auto()
-        ob.rotation_euler = Euler(
-            context.scene.objects[CUBE_NAME].rotation_euler)
-        bpy.data.meshes.remove(bpy.data.meshes[CUBE_NAME])
-
-        # For a cone we have to fix the origin along with saving its location and rotation
-        if (ob.name.startswith(localization_cone)):
-            ob.location, ob.rotation_euler, origin = fix_cone_origin_and_save_location_rotation(
-                ob, True)
-        else:
-            ob.location, ob.rotation_euler, origin = save_location_rotation(ob)
+        # Leaving edit mode writes the selection to the mesh, we come back once the rotation is fixed
+        # In edit mode we align to what the user selected, nothing selected works the same as object mode
+        if editing:
+            with stats.stage('mode'):
+                bpy.ops.object.editmode_toggle()
 
-        # Every object has a different offset after fixing the rotation
-        Z_offset_ob(ob)
-        bpy.ops.object.transform_apply(
-            location=False, rotation=True, scale=False)
+        with stats.stage('rotation'):
+            rotation = solve_applied_rotation(ob, editing)
+        with stats.stage('placement'):
+            apply_rotation_fix(ob, rotation)
 
-        restore_origin(origin)
+        if editing:
+            with stats.stage('mode'):
+                bpy.ops.object.editmode_toggle()
 
+        self.report({'INFO'}, stats.summary())
         return {'FINISHED'}
@@ -1,6 +1,6 @@
 from bpy.types import AddonPreferences
 from bpy.props import BoolProperty, IntProperty
-from . import addon_updater_ops
+from . import addon_updater_ops, speculative, stats
 import rna_keymap_ui
 
 
@@ -48,6 +48,22 @@ class RePrimitivePrefs(AddonPreferences):
         default=True,
     )
 
+    # counts operator calls, mode changes and depsgraph updates of every run, shown in the Debug panel
+    diagnostics: BoolProperty(
+        name='Diagnostics',
+        description="Count operator calls, mode changes and depsgraph updates of every RePrimitive operator",
+        default=False,
+        update=lambda self, context: stats.set_diagnostics(self.diagnostics),
+    )
+
+    # infers the active primitive in the background so the tweak dialog opens right away
+    speculative_inference: BoolProperty(
+        name='Infer Ahead',
+        description="Infer the parameters of the active primitive as soon as it's selected, the tweak dialog then opens without waiting",
+        default=False,
+        update=lambda self, context: speculative.set_enabled(self.speculative_inference),
+    )
+
     def draw(self, context):
         layout = self.layout
 
@@ -60,6 +76,10 @@ class RePrimitivePrefs(AddonPreferences):
         col_2 = split.column()
         col_1.label(text='Show Panel')
         col_2.prop(self, 'show_reprimitive_panel', text='')
+        col_1.label(text='Diagnostics')
+        col_2.prop(self, 'diagnostics', text='')
+        col_1.label(text='Infer Ahead')
+        col_2.prop(self, 'speculative_inference', text='')
 
         # hotkeys---------------------------------------------------------------------------
         box = layout.box()
@@ -0,0 +1,71 @@
+import bpy
+import numpy as np
+from mathutils import Vector, Matrix
+
+
+class MeshSnapshot:
+    """
+    Contiguous copies of the mesh data that inference needs, read with foreach_get once per invoke
+    Every calculate_* and applied_rotation_* function works on these arrays instead of wrapping each vertex in a Vector
+    """
+
+    def __init__(self, ob: bpy.types.Object):
+        mesh = ob.data
+
+        self.vert_count = len(mesh.vertices)
+        self.edge_count = len(mesh.edges)
+        self.poly_count = len(mesh.polygons)
+
+        # Split the world matrix into translation, rotation and whatever is left(scale and shear)
+        # We measure in object-local space with only the scale part applied, the rotation is added back when going to world space
+        self.matrix_world = ob.matrix_world.copy()
+        rotation = self.matrix_world.to_quaternion().to_matrix()
+        self.location = np.array(self.matrix_world.translation)
+        self.rotation = np.array(rotation)
+        self.rotation_euler = rotation.to_euler('XYZ', ob.rotation_euler)
+        local_scale = np.array(rotation.transposed() @ self.matrix_world.to_3x3())
+
+        # foreach_get is fastest when the buffer type matches the RNA type, we convert to doubles after
+        co = np.empty(self.vert_count*3, dtype=np.float32)
+        mesh.vertices.foreach_get('co', co)
+
+        # Scale the coordinates the same way applying scale would, without writing anything to the mesh
+        self.co = co.reshape(-1, 3).astype(np.float64) @ local_scale.T
+
+        # Pairs of vertex indices, one row per edge
+        self.edges = np.empty(self.edge_count*2, dtype=np.int32)
+        mesh.edges.foreach_get('vertices', self.edges)
+        self.edges = self.edges.reshape(-1, 2)
+
+        normals = np.empty(self.poly_count*3, dtype=np.float32)
+        mesh.polygons.foreach_get('normal', normals)
+        self.normals = normals.reshape(-1, 3).astype(np.float64)
+
+        # Number of corners of every polygon, tells triangles, quads and ngons apart
+        self.sizes = np.empty(self.poly_count, dtype=np.int32)
+        mesh.polygons.foreach_get('loop_total', self.sizes)
+
+    @property
+    def center(self) -> np.ndarray:
+        """ Median of all the vertices, same point ORIGIN_GEOMETRY with center='MEDIAN' would use """
+        return self.co.mean(axis=0)
+
+    @property
+    def dimensions(self) -> np.ndarray:
+        """ Bounding box size on local axes, same as ob.dimensions without modifiers """
+        return self.co.max(axis=0) - self.co.min(axis=0)
+
+    def to_world(self, point: np.ndarray) -> Vector:
+        """ Takes a point we measured and returns where it is in world space """
+        return Vector(self.location + self.rotation @ point)
+
+    def reorient(self, rotation: np.ndarray) -> None:
+        """
+        Looks at the mesh as if it was created with given rotation instead of having it applied
+        Coordinates and normals are rotated back flat on x/y axes and the rotation moves over to the object
+        """
+        self.co = self.co @ rotation
+        self.normals = self.normals @ rotation
+        self.rotation = self.rotation @ rotation
+        self.rotation_euler = Matrix(self.rotation).to_euler(
+            'XYZ', self.rotation_euler)
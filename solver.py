@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import numpy as np
+from math import pi, radians
+from typing import TYPE_CHECKING
+
+# Only used for annotations, the solver works on the arrays alone and can be tested without Blender
+if TYPE_CHECKING:
+    from .snapshot import MeshSnapshot
+
+# Angle(from +X towards +Y) of a reference vertex when Blender creates the primitive
+# Every ring is evenly spaced so any vertex of the ring works for the ones that have segments
+FIRST_VERTEX_AZIMUTH = {
+    'CIRCLE': radians(90),
+    'CONE': radians(90),
+    'CYLINDER': radians(90),
+    'UV_SPHERE': radians(90),
+    'TORUS': 0,
+    'ICOSPHERE': radians(-36),
+}
+
+# Relative tolerance used when grouping vertex heights along a candidate axis
+LEVEL_TOLERANCE = 1e-4
+
+# Tolerance(in radians) when comparing the angles between neighbouring verts of a ring
+SPACING_TOLERANCE = 1e-3
+
+# Size of a histogram bin when grouping unit directions, normals of the same cap always land in one bin
+DIRECTION_BIN = 1e-3
+
+
+def count_clusters(values: np.ndarray, step: float) -> int:
+    """ Sorts the values and counts the gaps bigger than step, unlike rounding it never splits two values that are close """
+    return int(np.count_nonzero(np.diff(np.sort(values)) > step)) + 1
+
+
+def bin_keys(values: np.ndarray, step: float) -> np.ndarray:
+    """
+    Rounds every row to a grid of given step and packs the row into a single integer
+    np.unique over integers is many times faster than np.unique(axis=0) over rows
+    """
+
+    bins = np.round(values / step).astype(np.int64)
+    bins -= bins.min(axis=0)
+    spans = bins.max(axis=0) + 1
+
+    keys = bins[:, 0]
+    for column in range(1, bins.shape[1]):
+        keys = keys*spans[column] + bins[:, column]
+
+    return keys
+
+
+def count_spacings(radial: np.ndarray, heights: np.ndarray, distances: np.ndarray, axis: np.ndarray, step: float) -> int:
+    """
+    How many different angles there are between neighbouring verts of the top(or bottom) ring
+    Around the true axis the ring is evenly spaced, a box shaped mesh looked at from the side is not
+    """
+
+    for ring in (heights > heights.max() - step, heights < heights.min() + step):
+        # Middle verts of trifan caps and poles sit on the axis and have no angle
+        ring &= distances > step
+        if np.count_nonzero(ring) >= 3:
+            break
+    else:
+        return 1
+
+    u = radial[ring][0] / distances[ring][0]
+    w = np.cross(axis, u)
+    angles = np.sort(np.arctan2(radial[ring] @ w, radial[ring] @ u))
+
+    return count_clusters(np.diff(angles, append=angles[0] + 2*pi), SPACING_TOLERANCE)
+
+
+def count_levels(centered: np.ndarray, axis: np.ndarray, size: float) -> int:
+    """
+    How many different heights and distances the vertices have around given axis
+    Verts of the same ring share both the height along the axis and the distance from it
+    """
+
+    step = max(size*LEVEL_TOLERANCE, 1e-7)
+    heights = centered @ axis
+    radial = centered - np.outer(heights, axis)
+    distances = np.linalg.norm(radial, axis=1)
+
+    return (count_clusters(heights, step) + count_clusters(distances, step)
+            + count_spacings(radial, heights, distances, axis, step))
+
+
+def principal_axes(points: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """ Eigenvalues and eigenvectors(as rows) of the covariance matrix, sorted by ascending eigenvalue """
+    values, vectors = np.linalg.eigh(points.T @ points)
+    return values, vectors.T
+
+
+def find_symmetry_axis(co: np.ndarray, extra_candidates: tuple = ()) -> np.ndarray:
+    """
+    Principal axis fit, a shape that is symmetrical around an axis has two equal eigenvalues and the third one belongs to the axis
+    We don't trust which one is the odd one out since they can all end up close, instead we check every candidate
+    and pick the one that sorts the vertices into the fewest rings, ties go to the eigenvalue that stands out the most
+    """
+
+    centered = co - co.mean(axis=0)
+    size = float(np.linalg.norm(centered, axis=1).max())
+
+    values, vectors = principal_axes(centered)
+    gaps = [min(abs(values[i] - values[j]) for j in range(3) if j != i)
+            for i in range(3)]
+
+    candidates = [*zip(vectors, gaps), *((axis, 0) for axis in extra_candidates)]
+    axis, _ = min(candidates, key=lambda candidate: (
+        count_levels(centered, candidate[0], size), -candidate[1]))
+
+    return axis
+
+
+def cluster_directions(directions: np.ndarray, weights: np.ndarray, count: int = 3) -> list[tuple[np.ndarray, float]]:
+    """
+    Histogram of directions that ignores their sign, a cap facing up and one facing down give the same axis
+    Returns the mean direction and the total weight of the heaviest bins
+    """
+
+    lengths = np.linalg.norm(directions, axis=1)
+    valid = lengths > 0
+    if not np.any(valid):
+        return []
+
+    directions = directions[valid] / lengths[valid, None]
+    weights = weights[valid]
+
+    # Flip every direction so its biggest component is positive
+    biggest = np.abs(directions).argmax(axis=1)
+    directions *= np.sign(directions[np.arange(len(directions)), biggest])[:, None]
+
+    # Directions that round to the same bin are the same, one np.unique call sorts all of them at once
+    _, bins = np.unique(bin_keys(directions, DIRECTION_BIN), return_inverse=True)
+
+    totals = np.bincount(bins, weights)
+    sums = np.zeros((len(totals), 3))
+    np.add.at(sums, bins, directions * weights[:, None])
+
+    heaviest = np.argsort(totals)[::-1][:count]
+    return [(sums[i] / np.linalg.norm(sums[i]), float(totals[i])) for i in heaviest]
+
+
+def side_normal_axis(normals: np.ndarray) -> list[tuple[np.ndarray, float]]:
+    """ Side faces all lean away from the axis by the same angle, so the tips of their normals lie on a plane perpendicular to it """
+    if len(normals) < 3:
+        return []
+    return [(principal_axes(normals - normals.mean(axis=0))[1][0], 0)]
+
+
+def find_cap_axis(snap: MeshSnapshot) -> np.ndarray:
+    """
+    Axis of a circle, cone or cylinder found from the direction its faces and edges point in
+    Every face of a cap points along the axis so caps are the heaviest bin of the normal histogram(weighted by corner count)
+    Caps that are NOTHING leave only the sides, all the side edges of a cylinder still point along the axis
+    and the normals of the sides(cylinder or cone) all lean away from it by the same angle
+    A circle with no cap has neither, there the principal axes take over
+    """
+
+    co = snap.co
+    centered = co - co.mean(axis=0)
+    size = float(np.linalg.norm(centered, axis=1).max())
+
+    candidates = cluster_directions(snap.normals, snap.sizes.astype(np.float64))
+
+    edges = co[snap.edges[:, 1]] - co[snap.edges[:, 0]]
+    candidates += cluster_directions(edges, np.ones(len(edges)))
+    candidates += side_normal_axis(snap.normals)
+
+    candidates.append((find_symmetry_axis(co), 0))
+
+    # Same check as for the principal axes, the true axis sorts the vertices into the fewest evenly spaced rings
+    axis, _ = min(candidates, key=lambda candidate: (
+        count_levels(centered, candidate[0], size), -candidate[1]))
+
+    return axis
+
+
+def frame_from_axis(axis: np.ndarray, reference: np.ndarray, azimuth: float) -> np.ndarray:
+    """
+    Builds the rotation with given axis as Z, spun so the reference vector lands at the given azimuth
+    Columns of the matrix are the X, Y and Z axes of the primitive
+    """
+
+    z = axis / np.linalg.norm(axis)
+
+    # Flatten the reference onto the plane perpendicular to the axis
+    u = reference - (reference @ z)*z
+    u /= np.linalg.norm(u)
+    w = np.cross(z, u)
+
+    x = np.cos(azimuth)*u - np.sin(azimuth)*w
+    y = np.cos(azimuth)*w + np.sin(azimuth)*u
+
+    return np.column_stack((x, y, z))
+
+
+def furthest_from_axis(centered: np.ndarray, axis: np.ndarray) -> np.ndarray:
+    """ Returns the vertex furthest away from the axis, it's never a middle vert of a cap or a pole """
+    radial = centered - np.outer(centered @ axis, axis)
+    return centered[np.argmax(np.einsum('ij,ij->i', radial, radial))]
+
+
+def vertex_degrees(snap: MeshSnapshot) -> np.ndarray:
+    """ How many edges every vertex has, one np.bincount over the edge array """
+    return np.bincount(snap.edges.ravel(), minlength=snap.vert_count)
+
+
+def find_poles(snap: MeshSnapshot) -> np.ndarray:
+    """
+    Indices of the poles of a UV sphere, they're the only verts that don't have 4 edges, they have one edge per segment instead
+    Empty for a sphere with 4 segments since every vertex there has 4 edges
+    """
+    return np.flatnonzero(vertex_degrees(snap) != 4)
+
+
+def triangle_normal_axes(snap: MeshSnapshot) -> tuple:
+    """ Triangles of a UV sphere only exist around the poles, their normals point roughly along the axis """
+    triangles = snap.normals[snap.sizes == 3]
+    if not len(triangles):
+        return ()
+    return tuple(principal_axes(triangles)[1])
+
+
+def solve_rotation(snap: MeshSnapshot, primitive: str) -> np.ndarray:
+    """
+    Returns the rotation(in the space we measure the snapshot in) that the primitive was created with
+    Multiplying the coordinates by it puts the primitive back flat on x/y axes, the same way Blender would create it
+    """
+
+    co = snap.co
+    centered = co - co.mean(axis=0)
+
+    if primitive == 'ICOSPHERE':
+
+        # Corners of the icosahedron it was subdivided from are the only verts with 5 edges(the rest have 6)
+        # Blender creates the bottom pole first and the ring around it next, subdividing only adds verts after them
+        corners = np.flatnonzero(vertex_degrees(snap) == 5)
+        if len(corners) != 12:
+            corners = np.arange(2)
+        axis = -centered[corners[0]]
+        reference = centered[corners[1]]
+
+    elif primitive in ('CIRCLE', 'CONE', 'CYLINDER'):
+        axis = find_cap_axis(snap)
+        reference = furthest_from_axis(centered, axis)
+
+    elif primitive == 'UV_SPHERE':
+
+        # The line through both poles is the axis, only a sphere with 4 segments has no poles that stand out
+        # Blender creates the top pole first, so the axis points from the last pole to the first one
+        poles = find_poles(snap)
+        if len(poles) == 2:
+            axis = centered[poles[0]] - centered[poles[1]]
+            axis /= np.linalg.norm(axis)
+        else:
+            axis = find_symmetry_axis(co, triangle_normal_axes(snap))
+        reference = furthest_from_axis(centered, axis)
+
+    else:
+        axis = find_symmetry_axis(co)
+        reference = furthest_from_axis(centered, axis)
+
+    return frame_from_axis(axis, reference, FIRST_VERTEX_AZIMUTH[primitive])
+
+
+def solve_selection_rotation(snap: MeshSnapshot, primitive: str, verts: np.ndarray, faces: np.ndarray) -> np.ndarray:
+    """
+    Rotation that puts the selection flat on x/y axes, the selected faces(or the plane through the selected verts) face up
+    Primitives spin the same way solve_rotation does, anything else gets X along the longest selected edge
+    """
+
+    co = snap.co
+    centered = co - co.mean(axis=0)
+
+    if np.any(faces):
+        axis = snap.normals[faces].sum(axis=0)
+    elif np.count_nonzero(verts) >= 3:
+        selected = centered[verts]
+        axis = principal_axes(selected - selected.mean(axis=0))[1][0]
+    else:
+        return np.identity(3)
+
+    length = np.linalg.norm(axis)
+    if length < 1e-9:
+        return np.identity(3)
+    axis = axis / length
+
+    if primitive:
+        return frame_from_axis(axis, furthest_from_axis(centered, axis), FIRST_VERTEX_AZIMUTH[primitive])
+
+    # Edges with both verts selected, flattened onto the plane perpendicular to the axis
+    edges = snap.edges[verts[snap.edges].all(axis=1)]
+    vectors = co[edges[:, 1]] - co[edges[:, 0]]
+    vectors -= np.outer(vectors @ axis, axis)
+    lengths = np.linalg.norm(vectors, axis=1)
+
+    if len(lengths) and lengths.max() > 1e-9:
+        reference = vectors[np.argmax(lengths)]
+    else:
+        # Any direction perpendicular to the axis works when there is no edge to go by
+        reference = np.cross(axis, (1, 0, 0) if abs(axis[0]) < 0.9 else (0, 1, 0))
+
+    return frame_from_axis(axis, reference, 0)
@@ -0,0 +1,78 @@
+"""
+Inference ahead of time, turned on in the addon preferences
+Whenever the active object changes to a primitive we infer its parameters once the user stops clicking around
+The result lands in the cache on its mesh, so the tweak dialog opens without waiting for the inference
+Its timings are in stats.last_speculative, failures are printed to the console
+"""
+
+import bpy
+import traceback
+from bpy.app.handlers import persistent
+from . import stats
+from .core import primitive_type, infer_parameters
+from .operators import RePrimitive
+
+# Seconds the active object has to stay the same before we start, clicking through objects only infers the last one
+IDLE_DELAY = 0.25
+
+# Owner of the msgbus subscription, anything unique works
+owner = object()
+
+
+def precompute():
+    """ Timer callback, infers the active object if the tweak could be called on it right now """
+
+    context = bpy.context
+    if not RePrimitive.poll(context):
+        return None
+
+    primitive = primitive_type(context.active_object)
+    if not primitive:
+        return None
+
+    # Timed apart from the last run so its breakdown stays readable in the debug panel
+    ob = context.active_object
+    with stats.speculative(ob.name):
+        try:
+            infer_parameters(ob, primitive)
+        except Exception as error:
+            # Nobody waits for this so there's nobody to report to, the tweak operator runs into it again once it's called
+            stats.last_speculative['error'] = str(error)
+            print(f"RePrimitive: inferring {ob.name} ahead of time failed")
+            traceback.print_exc()
+
+    return None
+
+
+def schedule() -> None:
+    """ msgbus callback, the timer is restarted on every change so only the object that stays active gets inferred """
+
+    if bpy.app.timers.is_registered(precompute):
+        bpy.app.timers.unregister(precompute)
+    bpy.app.timers.register(precompute, first_interval=IDLE_DELAY)
+
+
+def subscribe() -> None:
+    bpy.msgbus.subscribe_rna(key=(bpy.types.LayerObjects, "active"), owner=owner, args=(), notify=schedule)
+
+
+@persistent
+def resubscribe(*args) -> None:
+    """ Loading a file clears every msgbus subscription """
+    subscribe()
+
+
+def set_enabled(enabled: bool) -> None:
+    """ Subscribes to active object changes or removes the subscription, the timer and the load handler """
+
+    bpy.msgbus.clear_by_owner(owner)
+    if bpy.app.timers.is_registered(precompute):
+        bpy.app.timers.unregister(precompute)
+
+    handlers = bpy.app.handlers.load_post
+    if resubscribe in handlers:
+        handlers.remove(resubscribe)
+
+    if enabled:
+        subscribe()
+        handlers.append(resubscribe)
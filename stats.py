@@ -0,0 +1,148 @@
+"""
+Timings of the last operator run, read them from Python with stats.last_run after any RePrimitive operator
+Stages add up every time they run, a tweak with live previews counts its invoke once and only the latest execute
+With diagnostics on the run also counts operator calls, mode changes and depsgraph updates
+"""
+
+import bpy
+from bpy.app.handlers import persistent
+from contextlib import contextmanager
+from time import perf_counter
+
+# Stages of invoke, execute keeps them so the breakdown covers the whole tweak
+INVOKE_STAGES = ('cache', 'snapshot', 'rotation', 'inference', 'location')
+
+# Turned on from the addon preferences
+diagnostics = False
+
+# What bpy.ops calls every operator through, we put our own function in its place while diagnostics are on
+original_op_call = None
+
+
+def new_counters() -> dict:
+    return {'operators': {}, 'mode_changes': 0, 'depsgraph_updates': 0}
+
+
+# Seconds spent in every stage, in the order the stages first ran, and what diagnostics counted
+last_run = {
+    'operator': '',
+    'stages': {},
+    'counters': new_counters(),
+}
+
+# Stages of the last inference made ahead of time, kept apart so it never replaces the breakdown of the last run
+last_speculative = {
+    'object': '',
+    'stages': {},
+    'error': '',
+}
+
+# Where stages are added to, last_run unless something runs apart from it
+current = last_run
+
+
+def begin(operator: str, keep: tuple = ()) -> None:
+    """
+    Starts a new run, stages named in keep stay from the previous one(execute keeps what invoke measured)
+    Counters stay too when something is kept since it's still the same tweak
+    """
+    kept = {name: seconds for name, seconds in last_run['stages'].items() if name in keep}
+    last_run['operator'] = operator
+    last_run['stages'] = kept
+    if not keep:
+        last_run['counters'] = new_counters()
+
+
+@contextmanager
+def stage(name: str):
+    """ Adds the time spent inside the with block to given stage """
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        stages = current['stages']
+        stages[name] = stages.get(name, 0.0) + perf_counter() - start
+
+
+@contextmanager
+def speculative(name: str):
+    """ Stages inside the with block go to last_speculative, name is the object being inferred """
+
+    global current
+    last_speculative.update(object=name, stages={}, error='')
+    current = last_speculative
+    try:
+        yield
+    finally:
+        current = last_run
+
+
+def python_idname(idname: str) -> str:
+    """ OBJECT_OT_editmode_toggle -> object.editmode_toggle, Python style names pass through """
+    if "_OT_" in idname:
+        module, name = idname.split("_OT_", 1)
+        return f"{module.lower()}.{name}"
+    return idname
+
+
+def counted_op_call(idname, *args, **kwargs):
+    """
+    Every bpy.ops call from anywhere goes through here while diagnostics are on
+    Calls are counted once they return, an operator we call that starts a run of its own is counted in that run
+    A mode change is whatever leaves the context in another mode than it found it in
+    """
+
+    mode = bpy.context.mode
+    try:
+        return original_op_call(idname, *args, **kwargs)
+    finally:
+        counters = last_run['counters']
+        name = python_idname(idname)
+        counters['operators'][name] = counters['operators'].get(name, 0) + 1
+        if bpy.context.mode != mode:
+            counters['mode_changes'] += 1
+
+
+@persistent
+def count_depsgraph_update(scene, depsgraph) -> None:
+    """ Updates come after the operator returns, so every update until the next run belongs to the last one """
+    last_run['counters']['depsgraph_updates'] += 1
+
+
+def set_diagnostics(enabled: bool) -> None:
+    """ Operator calls and depsgraph updates are only counted while diagnostics are on, both cost something on every call """
+
+    global diagnostics, original_op_call
+    diagnostics = enabled
+
+    if enabled and original_op_call is None:
+        original_op_call = bpy.ops._op_call
+        bpy.ops._op_call = counted_op_call
+    elif not enabled and original_op_call is not None:
+        bpy.ops._op_call = original_op_call
+        original_op_call = None
+
+    handlers = bpy.app.handlers.depsgraph_update_post
+    if enabled and count_depsgraph_update not in handlers:
+        handlers.append(count_depsgraph_update)
+    elif not enabled and count_depsgraph_update in handlers:
+        handlers.remove(count_depsgraph_update)
+
+
+def total() -> float:
+    return sum(last_run['stages'].values())
+
+
+def summary() -> str:
+    """ One line breakdown for the operator report, in milliseconds, followed by the counters with diagnostics on """
+
+    stages = ", ".join(f"{name} {seconds*1000:.1f}" for name, seconds in last_run['stages'].items())
+    line = f"{total()*1000:.1f} ms ({stages})"
+
+    if diagnostics:
+        counters = last_run['counters']
+        operators = ", ".join(f"{idname} {count}" for idname, count in counters['operators'].items())
+        line += (f" | {sum(counters['operators'].values())} operator calls ({operators}),"
+                 f" {counters['mode_changes']} mode changes, {counters['depsgraph_updates']} depsgraph updates")
+
+    return line
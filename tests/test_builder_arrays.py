@@ -0,0 +1,73 @@
+"""
+Checks of the arrays the builders return, only NumPy is needed so these run with plain pytest
+From inside the tests folder, collecting from the addon folder imports its __init__.py and with it bpy
+
+    cd tests && python -m pytest
+"""
+
+import importlib.util
+import os
+
+import numpy as np
+import pytest
+
+# builders.py only imports Blender's modules where it writes into a mesh or builds an icosphere
+spec = importlib.util.spec_from_file_location(
+    "builders", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "builders.py"))
+builders = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(builders)
+
+FILLS = ('NOTHING', 'NGON', 'TRIFAN')
+
+
+def cases(calc_uvs):
+    """ One of every array built primitive, the icosphere comes from bmesh so it's left to test_builders.py """
+    for fill_type in FILLS:
+        yield f"circle {fill_type}", builders.build_circle(12, 1.0, fill_type, calc_uvs)
+        yield f"cone {fill_type}", builders.build_cone(12, 1.0, 0.5, 2.0, fill_type, calc_uvs)
+        yield f"cylinder {fill_type}", builders.build_cylinder(12, 1.0, 2.0, fill_type, calc_uvs)
+    yield "uv sphere", builders.build_uv_sphere(16, 8, 1.0, calc_uvs)
+    yield "torus", builders.build_torus(24, 8, 1.0, 0.25, calc_uvs)
+
+
+@pytest.mark.parametrize("calc_uvs", (False, True))
+def test_arrays_fit_together(calc_uvs):
+    """ Every loop, face and edge points at something that exists and every loop has a UV """
+
+    for name, (co, loops, starts, edges, uvs) in cases(calc_uvs):
+        assert co.shape[1] == 3, name
+        assert edges.shape[1] == 2, name
+        assert edges.max() < len(co), name
+        assert np.all(edges[:, 0] != edges[:, 1]), name
+
+        if len(loops):
+            assert loops.max() < len(co), name
+            assert starts[0] == 0 and np.all(np.diff(starts) >= 3), name
+            assert len(loops) - starts[-1] >= 3, name
+
+        if calc_uvs:
+            assert uvs.shape == (len(loops), 2), name
+        else:
+            assert uvs is None, name
+
+
+def test_every_face_edge_is_an_edge():
+    """ write_geometry looks up the edge of every loop, one that's missing would pick some other edge """
+
+    for name, (co, loops, starts, edges, uvs) in cases(False):
+        if not len(loops):
+            continue
+        following = loops[builders.next_loops(starts, len(loops))]
+        face_edges = {tuple(pair) for pair in np.sort(np.column_stack((loops, following)), axis=1).tolist()}
+        assert face_edges <= {tuple(pair) for pair in np.sort(edges, axis=1).tolist()}, name
+
+
+def test_circle_without_fill_keeps_its_uv_map():
+    """ No faces still means a UV map when UVs are asked for, the same as Blender's circle """
+
+    co, loops, starts, edges, uvs = builders.build_circle(32, 1.0, 'NOTHING', True)
+    assert len(loops) == len(starts) == 0
+    assert len(edges) == 32
+    assert uvs is not None and uvs.shape == (0, 2)
+
+    assert builders.build_circle(32, 1.0, 'NOTHING', False)[4] is None
@@ -0,0 +1,54 @@
+"""
+Regression checks for the geometry builders, they need Blender's Python modules
+
+    blender --background --factory-startup --python-expr "import pytest; pytest.main(['tests'])"
+"""
+
+import importlib.util
+import os
+
+import pytest
+
+pytest.importorskip("bpy")
+
+# builders.py has no relative imports, loading it from its file doesn't register the addon
+spec = importlib.util.spec_from_file_location(
+    "builders", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "builders.py"))
+builders = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(builders)
+
+COUNTS = (3, 4, 8, 32, 500)
+FILLS = ('NOTHING', 'NGON', 'TRIFAN')
+
+
+@pytest.mark.parametrize("vertices", COUNTS)
+@pytest.mark.parametrize("fill_type", FILLS)
+@pytest.mark.parametrize("calc_uvs", (False, True))
+def test_zero_radius_collapses_to_an_edge(vertices, fill_type, calc_uvs):
+    """ Every face welds away, Blender leaves the two tips and the edge between them """
+
+    for co, loops, starts, edges, uvs in (builders.build_cylinder(vertices, 0.0, 2.0, fill_type, calc_uvs),
+                                          builders.build_cone(vertices, 0.0, 0.0, 2.0, fill_type, calc_uvs)):
+        assert len(co) == 2
+        assert edges.tolist() == [[0, 1]]
+        assert len(loops) == len(starts) == 0
+        assert uvs is None or len(uvs) == 0
+
+
+@pytest.mark.parametrize("vertices", COUNTS)
+@pytest.mark.parametrize("fill_type", FILLS)
+def test_sharp_cone_keeps_its_sides(vertices, fill_type):
+    co, loops, starts, edges, uvs = builders.build_cone(vertices, 1.0, 0.0, 2.0, fill_type, True)
+    assert len(co) == vertices + 1 + (fill_type == 'TRIFAN')
+    assert len(uvs) == len(loops)
+    assert edges.max() < len(co)
+
+
+def test_write_geometry_without_faces():
+    import bpy
+
+    mesh = bpy.data.meshes.new("Cylinder")
+    builders.write_geometry(mesh, builders.build_cylinder(32, 0.0, 2.0, 'NGON', True), False)
+    assert (len(mesh.vertices), len(mesh.edges), len(mesh.polygons)) == (2, 1, 0)
+    assert mesh.uv_layers
+    bpy.data.meshes.remove(mesh)
@@ -0,0 +1,118 @@
+"""
+Checks of the mesh fingerprint and the inference cache, they need Blender's Python modules
+
+    blender --background --factory-startup --python-expr "import pytest; pytest.main(['tests'])"
+"""
+
+import importlib
+import os
+import sys
+
+import numpy as np
+import pytest
+
+bpy = pytest.importorskip("bpy")
+
+# cache.py imports the fingerprint relatively, so it's imported as part of the addon package(without registering it)
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(ADDON_DIR))
+package = os.path.basename(ADDON_DIR)
+builders = importlib.import_module(package + ".builders")
+cache = importlib.import_module(package + ".cache")
+fingerprint = importlib.import_module(package + ".fingerprint")
+
+from mathutils import Vector
+
+PARAMETERS = {'vertices': 16, 'radius': 1.0, 'depth': 2.0, 'cap_fill': 'NGON'}
+
+
+@pytest.fixture
+def ob():
+    mesh = bpy.data.meshes.new("Cylinder")
+    builders.write_geometry(mesh, builders.build_cylinder(16, 1.0, 2.0, 'NGON', True), False)
+    ob = bpy.data.objects.new("Cylinder", mesh)
+    bpy.context.collection.objects.link(ob)
+    yield ob
+    bpy.data.objects.remove(ob)
+    bpy.data.meshes.remove(mesh)
+
+
+def stored(ob, primitive='CYLINDER'):
+    """ Stores an entry for the mesh as it is, the rotation it was created with is none and the center is the origin """
+    digest = cache.geometry_hash(ob)
+    cache.store(ob, primitive, digest, dict(PARAMETERS, b_UV=True), np.eye(3), np.zeros(3), False)
+    return digest
+
+
+def test_hash_stays_for_the_same_geometry(ob):
+    assert cache.geometry_hash(ob) == cache.geometry_hash(ob)
+    assert fingerprint.fingerprints([ob.data, ob.data], workers=2) == [cache.geometry_hash(ob)]*2
+
+
+def test_hash_changes_with_a_moved_vertex(ob):
+    digest = cache.geometry_hash(ob)
+    ob.data.vertices[0].co.x += 0.001
+    assert cache.geometry_hash(ob) != digest
+
+
+def test_hash_changes_with_a_loose_edge(ob):
+    """ A loose edge leaves coordinates, loops and faces as they were """
+    digest = cache.geometry_hash(ob)
+    ob.data.edges.add(1)
+    ob.data.edges[-1].vertices = (0, 2)
+    assert cache.geometry_hash(ob) != digest
+
+
+def test_hash_changes_with_rewired_edges(ob):
+    """ Same vertices and faces, only which verts a loose edge connects differs """
+    ob.data.edges.add(1)
+    ob.data.edges[-1].vertices = (0, 2)
+    digest = cache.geometry_hash(ob)
+    ob.data.edges[-1].vertices = (0, 3)
+    assert cache.geometry_hash(ob) != digest
+
+
+def test_store_and_load_round_trip(ob):
+    digest = stored(ob)
+    parameters, location, rotation, origin, applied_rotation = cache.load(ob, 'CYLINDER', digest)
+
+    assert parameters == dict(PARAMETERS, b_UV=True)
+    assert np.allclose(location, (0, 0, 0))
+    assert np.allclose(rotation, (0, 0, 0))
+    assert np.allclose(origin, (0, 0, 0))
+    assert applied_rotation is False
+
+
+def test_placement_comes_from_the_object(ob):
+    """ Moving and rotating the object keeps the entry, the location and rotation follow the object """
+
+    digest = stored(ob)
+    ob.location = (1, 2, 3)
+    ob.rotation_euler = (0.3, 0.2, 0.1)
+    bpy.context.view_layer.update()
+
+    _, location, rotation, origin, _ = cache.load(ob, 'CYLINDER', digest)
+    assert np.allclose(location, (1, 2, 3))
+    assert np.allclose(rotation, (0.3, 0.2, 0.1))
+    assert np.allclose(origin, (1, 2, 3))
+
+
+def test_entry_only_loads_while_it_matches(ob):
+    digest = stored(ob)
+
+    assert cache.load(ob, 'CYLINDER', digest + "0") is None
+    assert cache.load(ob, 'CONE', digest) is None
+
+    ob.scale = (2, 2, 2)
+    bpy.context.view_layer.update()
+    assert cache.load(ob, 'CYLINDER', digest) is None
+
+
+def test_revalidate_drops_a_stale_entry(ob):
+    stored(ob)
+    cache.revalidate(ob.data)
+    assert cache.CACHE_KEY in ob.data
+
+    ob.data.vertices[0].co = Vector((5, 5, 5))
+    cache.revalidate(ob.data)
+    assert cache.CACHE_KEY not in ob.data
@@ -0,0 +1,130 @@
+"""
+Checks of how the rules of cli.py change parameters, the rule side of cli.py is plain Python
+
+    cd tests && python -m pytest
+"""
+
+import importlib.util
+import json
+import os
+
+import numpy as np
+import pytest
+
+spec = importlib.util.spec_from_file_location(
+    "cli", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cli.py"))
+cli = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(cli)
+
+# Same names as api.PARAMETERS, limits like the properties of the tweak operators
+PARAMETERS = {
+    'CYLINDER': ('vertices', 'radius', 'depth', 'cap_fill', 'b_UV'),
+    'UV_SPHERE': ('segments', 'rings', 'radius', 'b_UV'),
+}
+LIMITS = {'vertices': (3, 500), 'segments': (3, 100000), 'rings': (3, 100000), 'radius': (0, None), 'depth': (0, None)}
+
+
+def clamp(primitive, name, value):
+    """ Does what operators.clamp_parameter does with the limits above """
+    low, high = LIMITS.get(name, (None, None))
+    if low is not None:
+        value = max(value, low)
+    if high is not None:
+        value = min(value, high)
+    return value
+
+
+def cylinder():
+    return {'primitive': 'CYLINDER', 'vertices': 32, 'radius': 1.0, 'depth': 2.0, 'cap_fill': 'NGON', 'b_UV': True}
+
+
+def test_set_replaces_values():
+    parameters = cylinder()
+    assert cli.apply_rules([{"set": {"vertices": 16, "b_UV": False}}], "Cylinder", parameters, clamp)
+    assert parameters['vertices'] == 16 and parameters['b_UV'] is False
+
+
+def test_offset_adds_to_counts():
+    parameters = cylinder()
+    parameters['vertices'] = np.int64(32)
+    cli.apply_rules([{"offset": {"vertices": -8}}], "Cylinder", parameters, clamp)
+    assert parameters['vertices'] == 24
+
+
+def test_factor_multiplies_sizes():
+    parameters = cylinder()
+    cli.apply_rules([{"factor": {"radius": 0.5, "depth": 3}}], "Cylinder", parameters, clamp)
+    assert parameters['radius'] == pytest.approx(0.5)
+    assert parameters['depth'] == pytest.approx(6.0)
+
+
+def test_results_are_clamped():
+    parameters = cylinder()
+    cli.apply_rules([{"offset": {"vertices": -100}}, {"factor": {"radius": -1}}], "Cylinder", parameters, clamp)
+    assert parameters['vertices'] == 3
+    assert parameters['radius'] == 0
+
+    cli.apply_rules([{"set": {"vertices": 1000}}], "Cylinder", parameters, clamp)
+    assert parameters['vertices'] == 500
+
+
+def test_rules_apply_in_order():
+    parameters = cylinder()
+    cli.apply_rules([{"set": {"vertices": 10}}, {"offset": {"vertices": 2}}], "Cylinder", parameters, clamp)
+    assert parameters['vertices'] == 12
+
+
+def test_rules_filter_by_primitive_and_name():
+    rules = [{"primitive": "UV_SPHERE", "set": {"segments": 8}}, {"name": "Bolt*", "set": {"vertices": 6}}]
+
+    parameters = cylinder()
+    assert not cli.apply_rules(rules, "Cylinder.001", parameters, clamp)
+    assert parameters == cylinder()
+
+    assert cli.apply_rules(rules, "Bolt.001", parameters, clamp)
+    assert parameters['vertices'] == 6
+
+
+def test_offset_on_a_size_is_an_error():
+    with pytest.raises(ValueError):
+        cli.apply_rules([{"offset": {"radius": 1}}], "Cylinder", cylinder(), clamp)
+    with pytest.raises(ValueError):
+        cli.apply_rules([{"offset": {"b_UV": 1}}], "Cylinder", cylinder(), clamp)
+
+
+def test_factor_on_a_count_is_an_error():
+    with pytest.raises(ValueError):
+        cli.apply_rules([{"factor": {"vertices": 2}}], "Cylinder", cylinder(), clamp)
+    with pytest.raises(ValueError):
+        cli.apply_rules([{"factor": {"cap_fill": 2}}], "Cylinder", cylinder(), clamp)
+
+
+def test_valid_rules_load(tmp_path):
+    rules = [{"primitive": "CYLINDER", "set": {"vertices": 16}},
+             {"primitive": "UV_SPHERE", "name": "Rivet*", "offset": {"segments": -8}, "factor": {"radius": 0.5}},
+             {"factor": {"radius": 2}}]
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"rules": rules}))
+
+    assert cli.load_rules(str(path), PARAMETERS) == rules
+
+
+@pytest.mark.parametrize("rule", (
+    {"primitive": "CYLINDER", "sets": {"vertices": 16}},
+    {"primitive": "CYLINDER", "set": {"segments": 16}},
+    {"primitive": "UV_SPHERE", "factor": {"depth": 2}},
+    {"primitive": "CUBE", "set": {"vertices": 16}},
+    {"offset": {"verts": 2}},
+))
+def test_unknown_keys_fail_on_load(tmp_path, rule):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"rules": [rule]}))
+
+    with pytest.raises(ValueError):
+        cli.load_rules(str(path), PARAMETERS)
+
+
+def test_rule_keys_are_checked_without_parameters():
+    with pytest.raises(ValueError):
+        cli.validate_rules([{"primitive": "CYLINDER", "sets": {"vertices": 16}}])
+    cli.validate_rules([{"primitive": "CYLINDER", "set": {"anything": 16}}])
@@ -0,0 +1,87 @@
+"""
+Checks that solve_rotation gives back a rotation applied to a primitive, the solver and the builders only need NumPy
+
+    cd tests && python -m pytest
+"""
+
+import importlib.util
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load(name):
+    """ Neither module imports anything of the addon at runtime, loading them from their files doesn't register it """
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+builders = load("builders")
+solver = load("solver")
+
+
+def rotation_matrix(axis, angle):
+    """ Rodrigues' formula, the rotation we pretend was applied to the mesh """
+    axis = np.asarray(axis, dtype=np.float64)
+    x, y, z = axis / np.linalg.norm(axis)
+    k = np.array(((0, -z, y), (z, 0, -x), (-y, x, 0)))
+    return np.eye(3) + np.sin(angle)*k + (1 - np.cos(angle))*k @ k
+
+
+def snapshot(geometry, rotation):
+    """ The arrays of a MeshSnapshot of the built primitive with the rotation applied to it """
+
+    co, loops, starts, edges, uvs = geometry
+    sizes = np.diff(np.append(starts, len(loops)))
+    co = co @ rotation.T
+
+    # Newell's method, the same normal Blender gives a polygon
+    following = loops[builders.next_loops(starts, len(loops))]
+    a, b = co[loops], co[following]
+    corner = np.column_stack(((a[:, 1] - b[:, 1])*(a[:, 2] + b[:, 2]),
+                              (a[:, 2] - b[:, 2])*(a[:, 0] + b[:, 0]),
+                              (a[:, 0] - b[:, 0])*(a[:, 1] + b[:, 1])))
+    normals = np.add.reduceat(corner, starts)
+    normals /= np.linalg.norm(normals, axis=1)[:, None]
+
+    return SimpleNamespace(co=co, edges=edges, normals=normals, sizes=sizes,
+                           vert_count=len(co), edge_count=len(edges), poly_count=len(starts))
+
+
+ROTATIONS = (
+    rotation_matrix((1, 0, 0), 0.0),
+    rotation_matrix((1, 0, 0), np.pi),
+    rotation_matrix((1, 2, 3), 0.7),
+    rotation_matrix((-2, 1, 0.5), 2.4),
+)
+
+
+@pytest.mark.parametrize("segments", (5, 8, 16, 32))
+@pytest.mark.parametrize("rotation", ROTATIONS)
+def test_uv_sphere_axis_keeps_its_sign(segments, rotation):
+    """ The recovered Z points where the top pole went, a flipped axis turns the rebuilt sphere upside down """
+
+    geometry = builders.build_uv_sphere(segments, 8, 1.0, False)
+    solved = solver.solve_rotation(snapshot(geometry, rotation), 'UV_SPHERE')
+
+    assert solved[:, 2] @ rotation[:, 2] == pytest.approx(1.0, abs=1e-6)
+
+
+@pytest.mark.parametrize("segments", (5, 8, 16, 32))
+@pytest.mark.parametrize("rotation", ROTATIONS)
+def test_uv_sphere_rotates_back_onto_itself(segments, rotation):
+    """ Undoing the recovered rotation puts every vertex where Blender creates one, spinning by whole segments is allowed """
+
+    geometry = builders.build_uv_sphere(segments, 8, 1.0, False)
+    snap = snapshot(geometry, rotation)
+    solved = solver.solve_rotation(snap, 'UV_SPHERE')
+
+    unrotated = np.round(snap.co @ solved, 5)
+    created = np.round(geometry[0], 5)
+    assert sorted(map(tuple, unrotated + 0.0)) == sorted(map(tuple, created + 0.0))
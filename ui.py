@@ -2,6 +2,7 @@ import bpy
 from bpy.types import Panel
 from bpy.app import version
 from . import addon_updater_ops
+from . import stats
 
 
 class RePrimitivePanel(Panel):
@@ -42,3 +43,59 @@ class RePrimitivePanel(Panel):
         addon_updater_ops.update_notice_box_ui(self, context)
 
         return
+
+
+class RePrimitiveDebugPanel(Panel):
+    """ Where the time of the last run went, the same numbers are in stats.last_run """
+
+    bl_idname = 'VIEW3D_PT_RePrimitive_Debug_Panel'
+    bl_parent_id = 'VIEW3D_PT_RePrimitive_Panel'
+    bl_label = 'Debug'
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+
+        # Inference made ahead of time is timed apart from the runs
+        speculative = stats.last_speculative
+        if speculative['object']:
+            seconds = sum(speculative['stages'].values())
+            layout.label(text=f"Inferred {speculative['object']} ahead in {seconds*1000:.2f} ms")
+            if speculative['error']:
+                layout.label(text=speculative['error'], icon='ERROR')
+
+        if not stats.last_run['stages']:
+            layout.label(text="Run a RePrimitive operator first")
+            return
+
+        layout.label(text=stats.last_run['operator'])
+        split = layout.split(factor=0.6)
+        col_1 = split.column()
+        col_2 = split.column()
+
+        for name, seconds in stats.last_run['stages'].items():
+            col_1.label(text=name)
+            col_2.label(text=f"{seconds*1000:.2f} ms")
+
+        col_1.label(text="total")
+        col_2.label(text=f"{stats.total()*1000:.2f} ms")
+
+        # Counters only mean something while diagnostics are on
+        if not stats.diagnostics:
+            return
+
+        counters = stats.last_run['counters']
+        split = layout.split(factor=0.6)
+        col_1 = split.column()
+        col_2 = split.column()
+
+        for idname, count in counters['operators'].items():
+            col_1.label(text=idname)
+            col_2.label(text=str(count))
+
+        col_1.label(text="mode changes")
+        col_2.label(text=str(counters['mode_changes']))
+        col_1.label(text="depsgraph updates")
+        col_2.label(text=str(counters['depsgraph_updates']))